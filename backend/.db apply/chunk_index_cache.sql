@@ -0,0 +1,55 @@
+-- ============================================================
+-- Subtitle Chunks: Per-Video Chunk Index Cache
+-- ============================================================
+-- Narrow, pre-sorted copy of (video_id, chunk_id, short_title)
+-- used for the chunk dropdown (get_chunk_index). The backend
+-- calls refresh_chunk_index(vid) after chunk writes that change
+-- the index (ingest, title updates, deletes); it rewrites only
+-- that video's rows, so each refresh costs O(chunks of vid)
+-- rather than a rebuild over every video.
+--
+-- Replaces the earlier mv_chunk_index materialized view, which
+-- could only be refreshed as a whole.
+-- ============================================================
+
+DROP FUNCTION IF EXISTS refresh_chunk_index(TEXT);
+DROP MATERIALIZED VIEW IF EXISTS mv_chunk_index;
+
+CREATE TABLE IF NOT EXISTS chunk_index_cache (
+    video_id TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    short_title TEXT,
+    PRIMARY KEY (video_id, chunk_id)
+);
+
+-- Backfill existing videos
+INSERT INTO chunk_index_cache (video_id, chunk_id, short_title)
+    SELECT video_id, chunk_id, short_title
+    FROM subtitle_chunks
+ON CONFLICT (video_id, chunk_id) DO NOTHING;
+
+GRANT SELECT ON chunk_index_cache TO anon, authenticated, service_role;
+
+-- ============================================================
+-- Refresh function (called via supabase.rpc)
+-- ============================================================
+-- Called via: supabase.rpc("refresh_chunk_index", {"vid": video_id})
+
+CREATE OR REPLACE FUNCTION refresh_chunk_index(vid TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    DELETE FROM chunk_index_cache WHERE video_id = vid;
+    
+    INSERT INTO chunk_index_cache (video_id, chunk_id, short_title)
+        SELECT video_id, chunk_id, short_title
+        FROM subtitle_chunks
+        WHERE video_id = vid
+    -- A concurrent refresh of the same video may have inserted first
+    ON CONFLICT (video_id, chunk_id) DO UPDATE SET short_title = EXCLUDED.short_title;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION refresh_chunk_index(TEXT) TO service_role;
@@ -0,0 +1,29 @@
+-- ============================================================
+-- Subtitle Chunks: Processing Progress RPC
+-- ============================================================
+-- Counts total and AI-processed chunks for a video in one query
+-- so get_processing_progress no longer downloads every chunk row.
+-- A chunk counts as processed when all four AI fields are
+-- non-empty (same rule as is_chunk_processed in Python).
+--
+-- Called via: supabase.rpc("chunk_progress", {"vid": video_id})
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION chunk_progress(vid TEXT)
+RETURNS TABLE(total INTEGER, processed INTEGER)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        count(*)::INTEGER AS total,
+        count(*) FILTER (
+            WHERE NULLIF(short_title, '') IS NOT NULL
+              AND NULLIF(ai_field_1, '') IS NOT NULL
+              AND NULLIF(ai_field_2, '') IS NOT NULL
+              AND NULLIF(ai_field_3, '') IS NOT NULL
+        )::INTEGER AS processed
+    FROM subtitle_chunks
+    WHERE video_id = vid;
+$$;
+
+GRANT EXECUTE ON FUNCTION chunk_progress(TEXT) TO anon, authenticated, service_role;
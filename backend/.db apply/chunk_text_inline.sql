@@ -0,0 +1,18 @@
+-- ============================================================
+-- Subtitle Chunks: Inline Chunk Text (hybrid storage)
+-- ============================================================
+-- Short chunk texts (< INLINE_TEXT_MAX_BYTES in
+-- db/subtitle_chunks_crud.py) are kept in the row itself, so
+-- reading them costs no Storage round-trip. Longer texts stay
+-- in the subtitle-chunks bucket as before.
+--
+-- Each row has exactly one of chunk_text_inline /
+-- chunk_text_path set (rows from before this migration all
+-- have a path). Apply before deploying the matching backend;
+-- re-apply ingest_chunks_rpc.sql afterwards.
+-- ============================================================
+
+ALTER TABLE subtitle_chunks ADD COLUMN IF NOT EXISTS chunk_text_inline TEXT;
+ALTER TABLE subtitle_chunks ALTER COLUMN chunk_text_path DROP NOT NULL;
+
+COMMENT ON COLUMN subtitle_chunks.chunk_text_inline IS 'Chunk text for short chunks (NULL when stored in Storage at chunk_text_path)';
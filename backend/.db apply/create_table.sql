@@ -145,7 +145,7 @@ CREATE TABLE video_notes (
 );
 
 -- Create indexes for common queries
-CREATE INDEX idx_video_notes_user_email ON video_notes(user_email);
+-- CREATE INDEX idx_video_notes_user_email ON video_notes(user_email);
 CREATE INDEX idx_video_notes_updated_at ON video_notes(updated_at);
 
 -- Create trigger to auto-update updated_at
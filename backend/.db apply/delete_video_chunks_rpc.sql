@@ -0,0 +1,28 @@
+-- ============================================================
+-- Subtitle Chunks: Delete Video Chunks RPC
+-- ============================================================
+-- Deletes every chunk row for a video and hands back their
+-- storage paths in the same round-trip, so the caller can
+-- remove exactly those files without listing the bucket
+-- folder first (storage list() also pages at 100 entries).
+--
+-- Called via: supabase.rpc("delete_video_chunks", {"p_video_id": video_id})
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION delete_video_chunks(p_video_id TEXT)
+RETURNS TEXT[]
+LANGUAGE sql
+AS $$
+    WITH deleted AS (
+        DELETE FROM subtitle_chunks
+        WHERE video_id = p_video_id
+        RETURNING chunk_text_path
+    )
+    SELECT COALESCE(
+        array_agg(chunk_text_path) FILTER (WHERE chunk_text_path IS NOT NULL),
+        '{}'
+    )
+    FROM deleted;
+$$;
+
+GRANT EXECUTE ON FUNCTION delete_video_chunks(TEXT) TO service_role;
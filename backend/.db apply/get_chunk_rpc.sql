@@ -0,0 +1,27 @@
+-- ============================================================
+-- Subtitle Chunks: Single-Chunk Lookup RPC
+-- ============================================================
+-- get_chunk_details hits one chunk at a time. Wrapping the
+-- lookup in a SQL function lets Postgres reuse a cached plan
+-- (single-row scan on the (video_id, chunk_id) key) instead of
+-- PostgREST building and planning a fresh filtered SELECT.
+--
+-- SETOF (not a bare row type) so a missing chunk comes back as
+-- an empty list rather than a row of NULLs.
+--
+-- Called via: supabase.rpc("get_chunk", {"vid": video_id, "cid": chunk_id})
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION get_chunk(vid TEXT, cid INTEGER)
+RETURNS SETOF subtitle_chunks
+LANGUAGE sql
+STABLE
+ROWS 1
+AS $$
+    SELECT *
+    FROM subtitle_chunks
+    WHERE video_id = vid
+      AND chunk_id = cid;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_chunk(TEXT, INTEGER) TO anon, authenticated, service_role;
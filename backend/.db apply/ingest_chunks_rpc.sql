@@ -0,0 +1,96 @@
+-- ============================================================
+-- Subtitle Chunks: Bulk Ingest RPC
+-- ============================================================
+-- Set-based upsert for large chunk batches. The whole payload
+-- is expanded with jsonb_to_recordset and merged in a single
+-- INSERT ... ON CONFLICT, so parse/plan cost is paid once per
+-- batch. Used by bulk_create_chunks when it is given more than
+-- INGEST_RPC_THRESHOLD chunks.
+--
+-- skip_existing = TRUE is the pure re-ingest mode: rows already
+-- present are left untouched (ON CONFLICT DO NOTHING), so no
+-- tuple rewrite / WAL for unchanged chunks.
+--
+-- update_columns lists the AI fields the payload sets. Existing
+-- rows keep their value for AI fields not listed, so leaving a
+-- field out never blanks it (jsonb_to_recordset can't tell an
+-- absent key from an explicit null).
+--
+-- Called via: supabase.rpc("ingest_chunks", {"payload": rows, "skip_existing": False,
+--                                            "update_columns": ["short_title", ...]})
+-- ============================================================
+
+-- Replaces the earlier versions
+DROP FUNCTION IF EXISTS ingest_chunks(JSONB);
+DROP FUNCTION IF EXISTS ingest_chunks(JSONB, BOOLEAN);
+
+CREATE OR REPLACE FUNCTION ingest_chunks(
+    payload JSONB,
+    skip_existing BOOLEAN DEFAULT FALSE,
+    update_columns TEXT[] DEFAULT ARRAY['short_title', 'ai_field_1', 'ai_field_2', 'ai_field_3']
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    IF skip_existing THEN
+        INSERT INTO subtitle_chunks (
+            video_id, chunk_id, chunk_text_path, chunk_text_inline,
+            short_title, ai_field_1, ai_field_2, ai_field_3
+        )
+        SELECT
+            r.video_id, r.chunk_id, r.chunk_text_path, r.chunk_text_inline,
+            r.short_title, r.ai_field_1, r.ai_field_2, r.ai_field_3
+        FROM jsonb_to_recordset(payload) AS r(
+            video_id TEXT,
+            chunk_id INTEGER,
+            chunk_text_path TEXT,
+            chunk_text_inline TEXT,
+            short_title TEXT,
+            ai_field_1 TEXT,
+            ai_field_2 TEXT,
+            ai_field_3 TEXT
+        )
+        ON CONFLICT (video_id, chunk_id) DO NOTHING;
+        
+        GET DIAGNOSTICS affected = ROW_COUNT;
+        RETURN affected;
+    END IF;
+    
+    INSERT INTO subtitle_chunks (
+        video_id, chunk_id, chunk_text_path, chunk_text_inline,
+        short_title, ai_field_1, ai_field_2, ai_field_3
+    )
+    SELECT
+        r.video_id, r.chunk_id, r.chunk_text_path, r.chunk_text_inline,
+        r.short_title, r.ai_field_1, r.ai_field_2, r.ai_field_3
+    FROM jsonb_to_recordset(payload) AS r(
+        video_id TEXT,
+        chunk_id INTEGER,
+        chunk_text_path TEXT,
+        chunk_text_inline TEXT,
+        short_title TEXT,
+        ai_field_1 TEXT,
+        ai_field_2 TEXT,
+        ai_field_3 TEXT
+    )
+    ON CONFLICT (video_id, chunk_id) DO UPDATE SET
+        chunk_text_path = EXCLUDED.chunk_text_path,
+        chunk_text_inline = EXCLUDED.chunk_text_inline,
+        short_title = CASE WHEN 'short_title' = ANY(update_columns)
+            THEN EXCLUDED.short_title ELSE subtitle_chunks.short_title END,
+        ai_field_1 = CASE WHEN 'ai_field_1' = ANY(update_columns)
+            THEN EXCLUDED.ai_field_1 ELSE subtitle_chunks.ai_field_1 END,
+        ai_field_2 = CASE WHEN 'ai_field_2' = ANY(update_columns)
+            THEN EXCLUDED.ai_field_2 ELSE subtitle_chunks.ai_field_2 END,
+        ai_field_3 = CASE WHEN 'ai_field_3' = ANY(update_columns)
+            THEN EXCLUDED.ai_field_3 ELSE subtitle_chunks.ai_field_3 END;
+    
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION ingest_chunks(JSONB, BOOLEAN, TEXT[]) TO service_role;
@@ -0,0 +1,54 @@
+-- ============================================================
+-- Job Queue: Enum Column Migration
+-- ============================================================
+-- This migration moves the low-cardinality TEXT columns of
+-- job_queue onto Postgres enums (4 bytes per value):
+-- 1. status   -> job_status
+-- 2. job_type -> job_type
+-- Smaller rows and index keys make the status scans in
+-- get_next_job / get_job_stats cheaper on large queues.
+-- Python keeps sending plain strings; PostgREST casts them.
+--
+-- Note: books.type is intentionally left as VARCHAR because
+-- new content types ('book', 'lecture', ...) are user supplied.
+-- ============================================================
+
+-- ============================================================
+-- Step 1: Create enum types
+-- ============================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'job_status') THEN
+        CREATE TYPE job_status AS ENUM ('pending', 'processing', 'completed', 'failed');
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'job_type') THEN
+        CREATE TYPE job_type AS ENUM ('subtitle_extraction', 'chunk_processing', 'ai_enrichment');
+    END IF;
+END $$;
+
+-- ============================================================
+-- Step 2: Convert columns (defaults must be dropped first)
+-- ============================================================
+
+ALTER TABLE job_queue ALTER COLUMN status DROP DEFAULT;
+
+ALTER TABLE job_queue
+    ALTER COLUMN status TYPE job_status USING status::job_status;
+
+ALTER TABLE job_queue ALTER COLUMN status SET DEFAULT 'pending';
+
+ALTER TABLE job_queue
+    ALTER COLUMN job_type TYPE job_type USING job_type::job_type;
+
+COMMENT ON COLUMN job_queue.status IS 'Job status enum: pending, processing, completed, failed';
+COMMENT ON COLUMN job_queue.job_type IS 'Job type enum: subtitle_extraction, chunk_processing, ai_enrichment';
+
+-- ============================================================
+-- Verification
+-- ============================================================
+
+SELECT column_name, udt_name
+FROM information_schema.columns
+WHERE table_name = 'job_queue' AND column_name IN ('status', 'job_type');
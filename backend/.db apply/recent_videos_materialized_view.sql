@@ -0,0 +1,42 @@
+-- ============================================================
+-- YouTube Videos: Recently Updated Materialized View
+-- ============================================================
+-- Precomputed copy of the (at most 200) videos updated in the
+-- last 24 hours, read by get_recently_updated_videos instead of
+-- range-scanning and sorting youtube_videos on every call.
+--
+-- The 24 h window is fixed when the view is refreshed, so the
+-- backend still filters on updated_at. pg_cron refreshes it
+-- every 5 minutes; rows can lag youtube_videos by that much.
+--
+-- Requires the pg_cron extension (Dashboard -> Database ->
+-- Extensions) for the refresh schedule at the bottom.
+-- ============================================================
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS recent_videos_24h AS
+    SELECT *
+    FROM youtube_videos
+    WHERE updated_at > NOW() - INTERVAL '24 hours'
+    ORDER BY updated_at DESC
+    LIMIT 200;
+
+-- Unique index is required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recent_videos_24h_id
+    ON recent_videos_24h (id);
+
+CREATE INDEX IF NOT EXISTS idx_recent_videos_24h_updated_at
+    ON recent_videos_24h (updated_at DESC);
+
+GRANT SELECT ON recent_videos_24h TO anon, authenticated, service_role;
+
+-- ============================================================
+-- Refresh schedule (pg_cron)
+-- ============================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+SELECT cron.schedule(
+    'refresh-recent-videos-24h',
+    '*/5 * * * *',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY recent_videos_24h'
+);
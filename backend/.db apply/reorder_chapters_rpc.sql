@@ -0,0 +1,45 @@
+-- ============================================================
+-- Book Chapters: Reorder RPC (2nd database - books)
+-- ============================================================
+-- Renumbers a book's chapters in one round-trip and one
+-- transaction. p_order lists the current chapter_ids in their
+-- new order; they become 1, 2, 3, ... (1-indexed).
+--
+-- The moved chapters are first parked on negative ids so the
+-- (book_id, chapter_id) primary key never collides mid-way.
+-- An unknown chapter_id raises, rolling everything back, so a
+-- failed reorder can't leave chapters on negative ids.
+-- Storage paths (chapter_text_path) are untouched.
+--
+-- Called via: supabase.rpc("reorder_chapters", {"p_book": book_id, "p_order": chapter_order})
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION reorder_chapters(p_book TEXT, p_order INTEGER[])
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE book_chapters
+    SET chapter_id = -chapter_id
+    WHERE book_id = p_book
+      AND chapter_id = ANY(p_order);
+    
+    UPDATE book_chapters AS c
+    SET chapter_id = u.pos, updated_at = NOW()
+    FROM unnest(p_order) WITH ORDINALITY AS u(old_id, pos)
+    WHERE c.book_id = p_book
+      AND c.chapter_id = -u.old_id;
+    
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    IF affected <> cardinality(p_order) THEN
+        RAISE EXCEPTION 'Invalid chapter order for book %: % of % chapters found',
+            p_book, affected, cardinality(p_order);
+    END IF;
+    
+    RETURN affected;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION reorder_chapters(TEXT, INTEGER[]) TO service_role;
@@ -0,0 +1,30 @@
+-- ============================================================
+-- YouTube Videos: Tag search RPC
+-- ============================================================
+-- Returns the most viewed videos sharing ANY of the given tags.
+-- tags && p_tags (overlap) is answered from the GIN index on
+-- youtube_videos.tags, so the search is an index lookup rather
+-- than a containment check on every row. The result is capped
+-- at p_limit rows.
+--
+-- The index already exists on databases created from
+-- create_table.sql (idx_tags); it is (re)created here for older ones.
+--
+-- Called via: supabase.rpc("search_videos_by_tags_any", {"p_tags": tags, "p_limit": limit})
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_tags ON youtube_videos USING GIN(tags) WITH (fastupdate = on);
+
+CREATE OR REPLACE FUNCTION search_videos_by_tags_any(p_tags TEXT[], p_limit INTEGER DEFAULT 100)
+RETURNS SETOF youtube_videos
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT *
+    FROM youtube_videos
+    WHERE tags && p_tags
+    ORDER BY view_count DESC
+    LIMIT p_limit;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_videos_by_tags_any(TEXT[], INTEGER) TO service_role;
@@ -0,0 +1,38 @@
+-- ============================================================
+-- YouTube Videos: Storage Cleanup Queue
+-- ============================================================
+-- Deleting a youtube_videos row cascades to subtitle_chunks, but
+-- the chunk text files in the subtitle-chunks bucket are outside
+-- the database. This AFTER DELETE trigger records the video in
+-- storage_cleanup_queue in the same transaction as the delete,
+-- so the backend only issues the DELETE and removes the files
+-- afterwards (batched, in the background). A queued video whose
+-- cleanup fails stays queued and is retried by the next drain.
+--
+-- Drained by: youtube_crud.drain_storage_cleanup_queue()
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS storage_cleanup_queue (
+    video_id TEXT PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+GRANT SELECT, INSERT, DELETE ON storage_cleanup_queue TO service_role;
+
+CREATE OR REPLACE FUNCTION enqueue_video_storage_cleanup()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO storage_cleanup_queue (video_id, created_at)
+    VALUES (OLD.id, NOW())
+    ON CONFLICT (video_id) DO NOTHING;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_youtube_videos_storage_cleanup ON youtube_videos;
+CREATE TRIGGER trg_youtube_videos_storage_cleanup
+    AFTER DELETE ON youtube_videos
+    FOR EACH ROW
+    EXECUTE FUNCTION enqueue_video_storage_cleanup();
@@ -0,0 +1,23 @@
+-- ============================================================
+-- Subtitle Chunks: Unprocessed Flag + Partial Index
+-- ============================================================
+-- get_unprocessed_chunks used an OR across four nullable
+-- columns, which can't use an index and forces a Seq Scan.
+-- This adds a stored generated flag and a partial index that
+-- only covers chunks still waiting for AI enrichment.
+-- ============================================================
+
+ALTER TABLE subtitle_chunks
+    ADD COLUMN IF NOT EXISTS is_unprocessed BOOLEAN
+    GENERATED ALWAYS AS (
+        short_title IS NULL
+        OR ai_field_1 IS NULL
+        OR ai_field_2 IS NULL
+        OR ai_field_3 IS NULL
+    ) STORED;
+
+COMMENT ON COLUMN subtitle_chunks.is_unprocessed IS 'TRUE while any AI field is NULL (generated)';
+
+CREATE INDEX IF NOT EXISTS idx_subtitle_chunks_unprocessed
+    ON subtitle_chunks (video_id, chunk_id)
+    WHERE is_unprocessed;
@@ -0,0 +1,35 @@
+-- ============================================================
+-- Subtitle Chunks: Batch AI Field Update RPC
+-- ============================================================
+-- Applies AI enrichment results for many chunks of one video
+-- in a single UPDATE ... FROM jsonb_array_elements, so the
+-- statement is planned once per batch. Unlike a partial-row
+-- upsert it never inserts: chunk ids that don't exist are
+-- simply skipped. Returns the chunk_id of every updated row.
+--
+-- p_rows: [{"chunk_id": 1, "title": "...", "field_1": "...",
+--           "field_2": "...", "field_3": "..."}, ...]
+--
+-- Called via: supabase.rpc("update_ai_fields_batch", {"p_video_id": video_id, "p_rows": rows})
+-- ============================================================
+
+-- Earlier version returned the row count; the return type can't be changed in place
+DROP FUNCTION IF EXISTS update_ai_fields_batch(TEXT, JSONB);
+
+CREATE OR REPLACE FUNCTION update_ai_fields_batch(p_video_id TEXT, p_rows JSONB)
+RETURNS TABLE (chunk_id INTEGER)
+LANGUAGE sql
+AS $$
+    UPDATE subtitle_chunks AS s
+    SET
+        short_title = COALESCE(r->>'title', ''),
+        ai_field_1 = COALESCE(r->>'field_1', ''),
+        ai_field_2 = COALESCE(r->>'field_2', ''),
+        ai_field_3 = COALESCE(r->>'field_3', '')
+    FROM jsonb_array_elements(p_rows) AS r
+    WHERE s.video_id = p_video_id
+      AND s.chunk_id = (r->>'chunk_id')::INTEGER
+    RETURNING s.chunk_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION update_ai_fields_batch(TEXT, JSONB) TO service_role;
@@ -0,0 +1,33 @@
+-- ============================================================
+-- Subtitle Chunks: Partial AI Field Update RPC
+-- ============================================================
+-- Writes AI fields for many chunks (any videos) in a single
+-- UPDATE ... FROM jsonb_array_elements. Each row only sets the
+-- keys it contains; columns whose key is absent keep their
+-- current value. Like update_ai_fields_batch it never inserts:
+-- rows for chunks that don't exist are skipped and are simply
+-- missing from the result.
+--
+-- p_rows: [{"video_id": "...", "chunk_id": 1, "short_title": "...",
+--           "ai_field_1": "...", "ai_field_2": "...", "ai_field_3": "..."}, ...]
+--
+-- Called via: supabase.rpc("update_chunk_ai_fields", {"p_rows": rows})
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION update_chunk_ai_fields(p_rows JSONB)
+RETURNS SETOF subtitle_chunks
+LANGUAGE sql
+AS $$
+    UPDATE subtitle_chunks AS s
+    SET
+        short_title = CASE WHEN r ? 'short_title' THEN r->>'short_title' ELSE s.short_title END,
+        ai_field_1 = CASE WHEN r ? 'ai_field_1' THEN r->>'ai_field_1' ELSE s.ai_field_1 END,
+        ai_field_2 = CASE WHEN r ? 'ai_field_2' THEN r->>'ai_field_2' ELSE s.ai_field_2 END,
+        ai_field_3 = CASE WHEN r ? 'ai_field_3' THEN r->>'ai_field_3' ELSE s.ai_field_3 END
+    FROM jsonb_array_elements(p_rows) AS r
+    WHERE s.video_id = r->>'video_id'
+      AND s.chunk_id = (r->>'chunk_id')::INTEGER
+    RETURNING s.*;
+$$;
+
+GRANT EXECUTE ON FUNCTION update_chunk_ai_fields(JSONB) TO service_role;
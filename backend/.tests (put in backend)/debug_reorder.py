@@ -29,25 +29,9 @@ def debug_reorder():
     print("\n[TEST] Reordering to [3, 1, 2] (move chapter 3 to front):\n")
     chapter_order = [3, 1, 2]  # Current chapter_ids in desired order
     
-    # Step 1: Set to negative temps
-    print("Step 1: Setting temporary negative IDs")
-    for idx, old_id in enumerate(chapter_order):
-        temp_id = -(idx + 1)
-        print(f"  Chapter {old_id} -> temp {temp_id}")
-        supabase.table("book_chapters").update({"chapter_id": temp_id}).eq("book_id", test_book_id).eq("chapter_id", old_id).execute()
-    
-    chapters_temp = get_chapters_by_book(test_book_id)
-    print("\nAFTER TEMP IDS:")
-    for ch in sorted(chapters_temp, key=lambda x: x['chapter_id']):
-        print(f"  ID={ch['chapter_id']}, Title='{ch['chapter_title']}'")
-    
-    # Step 2: Set to final positions
-    print("\nStep 2: Setting final positions (1-indexed)")
-    for idx, old_id in enumerate(chapter_order):
-        temp_id = -(idx + 1)
-        new_id = idx + 1  # This should be 1, 2, 3
-        print(f"  temp {temp_id} -> final {new_id} (was originally chapter {old_id})")
-        supabase.table("book_chapters").update({"chapter_id": new_id}).eq("book_id", test_book_id).eq("chapter_id", temp_id).execute()
+    # Single RPC - both renumbering phases run inside one transaction
+    print("Reordering via reorder_chapters RPC")
+    supabase.rpc("reorder_chapters", {"p_book": test_book_id, "p_order": chapter_order}).execute()
     
     chapters_final = get_chapters_by_book(test_book_id)
     print("\nAFTER FINAL IDS:")
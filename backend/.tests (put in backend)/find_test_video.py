@@ -1,17 +1,15 @@
 """Quick script to find videos with chunks for testing"""
-from db.youtube_crud import get_all_videos
-from db.subtitle_chunks_crud import get_chunks_by_video
+from db.subtitle_chunks_crud import get_videos_with_chunk_counts
 
-videos = get_all_videos(limit=10)
+videos = get_videos_with_chunk_counts(limit=10)
 print('\n=== Videos with chunks ===\n')
 
 videos_with_chunks = []
 for v in videos:
-    chunks = get_chunks_by_video(v['id'])
-    if len(chunks) > 0:
+    if v['chunk_count'] > 0:
         print(f"✓ {v['id']}: {v['title'][:60]}...")
-        print(f"  Chunks: {len(chunks)}")
-        videos_with_chunks.append((v['id'], len(chunks)))
+        print(f"  Chunks: {v['chunk_count']}")
+        videos_with_chunks.append((v['id'], v['chunk_count']))
 
 if not videos_with_chunks:
     print("No videos with chunks found.")
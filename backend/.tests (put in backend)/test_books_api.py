@@ -5,6 +5,7 @@ This creates a real book that can be viewed in the frontend
 import requests
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +13,7 @@ load_dotenv()
 # Configuration
 API_BASE = "http://localhost:8000"
 BOOK_ID = "practical_guide_123"
+REQUEST_TIMEOUT = 60  # seconds - a hung backend fails the run instead of blocking it
 
 # Test user - get token from .env
 TOKEN = os.getenv("TEST_JWT_TOKEN")
@@ -40,6 +42,7 @@ def test_create_book():
     
     response = requests.post(
         f"{API_BASE}/api/book",
+        timeout=REQUEST_TIMEOUT,
         headers=headers,
         json=book_data
     )
@@ -58,6 +61,7 @@ def test_get_book(book_id):
     """Test getting book metadata"""
     response = requests.get(
         f"{API_BASE}/api/book/{book_id}",
+        timeout=REQUEST_TIMEOUT,
         headers=headers
     )
     
@@ -75,6 +79,7 @@ def test_get_chapter_index(book_id):
     """Test getting chapter index"""
     response = requests.get(
         f"{API_BASE}/api/book/{book_id}/chapters/index",
+        timeout=REQUEST_TIMEOUT,
         headers=headers
     )
     
@@ -95,6 +100,7 @@ def test_get_chapter(book_id, chapter_id):
     """Test getting chapter details"""
     response = requests.get(
         f"{API_BASE}/api/book/{book_id}/chapter/{chapter_id}",
+        timeout=REQUEST_TIMEOUT,
         headers=headers
     )
     
@@ -120,6 +126,7 @@ def test_update_chapter_note(book_id, chapter_id):
     
     response = requests.post(
         f"{API_BASE}/api/book/chapter/note",
+        timeout=REQUEST_TIMEOUT,
         headers=headers,
         json=note_data
     )
@@ -144,6 +151,7 @@ def test_create_book_note(book_id):
     
     response = requests.post(
         f"{API_BASE}/api/book/note",
+        timeout=REQUEST_TIMEOUT,
         headers=headers,
         json=note_data
     )
@@ -162,6 +170,7 @@ def test_get_book_note(book_id):
     """Test getting book note"""
     response = requests.get(
         f"{API_BASE}/api/book/{book_id}/note",
+        timeout=REQUEST_TIMEOUT,
         headers=headers
     )
     
@@ -192,14 +201,14 @@ if __name__ == "__main__":
         print("\n❌ ERROR: No TEST_JWT_TOKEN in .env file")
         print("   Get it by logging in to the frontend and checking browser devtools")
         print("   Add it to .env as: TEST_JWT_TOKEN=your_token_here")
-        exit(1)
+        sys.exit(1)
     
     try:
         # Run tests
         result = test_create_book()
         if not result:
             print("\n❌ Failed to create book - stopping tests")
-            exit(1)
+            sys.exit(1)
             
         test_get_book(BOOK_ID)
         test_get_chapter_index(BOOK_ID)
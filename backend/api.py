@@ -8,9 +8,13 @@ import sys
 import threading
 import json
 import re
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
+
+# DB modules log through `logging`; set LOG_LEVEL=DEBUG to see [DB->]/[DB<-] traces
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI, HTTPException, Depends
@@ -35,14 +39,17 @@ from orchestrator import (
 # Import from auth and db directly
 from auth import get_current_user, is_email_verified
 from prompts import get_all_prompts, get_prompt_label
-from db.youtube_crud import get_video_by_id, get_all_videos, delete_video
+from db.youtube_crud import get_video_by_id, aget_video_by_id, get_all_videos, delete_video, VIDEO_ID_FIELDS
 from db.video_notes_crud import (
     create_or_update_note,
-    get_note_by_video_id,
+    aget_note_by_video_id,
     get_notes_with_video_info
 )
 from db.subtitle_chunks_crud import (
     get_chunks_by_video,
+    has_chunks,
+    count_chunks,
+    CHUNK_STATUS_COLUMNS,
     get_chunk_index,
     get_chunk_details,
     load_chunks_text,
@@ -76,6 +83,7 @@ from db.book_notes_crud import (
     get_note_by_book_id,
     get_notes_with_book_info
 )
+from db.job_queue_crud import close_pg_pool
 
 app = FastAPI(title="YouTube Notes API", version="2.0.0")
 
@@ -95,6 +103,12 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+async def close_db_pools():
+    """Close the direct Postgres pool (opened lazily by the job_queue fast paths)"""
+    await close_pg_pool()
+
+
 # Models
 class VideoRequest(BaseModel):
     video_url: str
@@ -446,7 +460,7 @@ async def get_video(request: VideoRequest, current_user: dict = Depends(get_curr
             if not metadata:
                 raise HTTPException(status_code=404, detail="Video not found")
             
-            video = get_video_by_id(video_id)
+            video = metadata.get('video') or get_video_by_id(video_id)
         
         return VideoResponse(
             video_id=video['id'],
@@ -470,7 +484,7 @@ async def get_video(request: VideoRequest, current_user: dict = Depends(get_curr
 async def get_video_by_id_endpoint(video_id: str, current_user: dict = Depends(get_current_user)):
     """Get video metadata by video ID from database"""
     try:
-        video = get_video_by_id(video_id)
+        video = await aget_video_by_id(video_id)
         
         if not video:
             raise HTTPException(status_code=404, detail="Video not found in database")
@@ -496,7 +510,7 @@ async def get_video_by_id_endpoint(video_id: str, current_user: dict = Depends(g
 @app.get("/api/note/{video_id}")
 async def get_note(video_id: str, current_user: dict = Depends(get_current_user)):
     try:
-        note = get_note_by_video_id(video_id)
+        note = await aget_note_by_video_id(video_id)
         return note if note else {"video_id": video_id, "note_content": None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -537,17 +551,19 @@ async def get_creator_notes(
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        all_notes = get_notes_with_video_info(limit=1000)
+        # Channel match happens in the database instead of over the first 1000 notes
+        notes = get_notes_with_video_info(limit=limit, channel=channel)
         
-        filtered_notes = [
-            note for note in all_notes
-            if note.get('channel_title') and 
-            channel.lower() in note['channel_title'].lower()
-        ]
+        # Flatten the embedded video fields for the creator notes view
+        for note in notes:
+            video = note.pop('youtube_videos', None) or {}
+            note['video_title'] = video.get('title')
+            note['channel_title'] = video.get('channel_title')
+            note['published_at'] = video.get('published_at')
         
         return {
-            "notes": filtered_notes[:limit],
-            "count": len(filtered_notes[:limit]),
+            "notes": notes,
+            "count": len(notes),
             "channel": channel
         }
     except Exception as e:
@@ -609,7 +625,7 @@ async def get_chunk_ai_status(video_id: str, chunk_id: Optional[int] = None, cur
     """
     try:
         from db.subtitle_chunks_crud import get_chunks_by_video
-        chunks = get_chunks_by_video(video_id)
+        chunks = get_chunks_by_video(video_id, columns=CHUNK_STATUS_COLUMNS)
         
         if chunk_id is not None:
             # Single chunk check
@@ -704,7 +720,7 @@ async def process_video_endpoint(request: VideoRequest, current_user: dict = Dep
             raise HTTPException(status_code=400, detail="Invalid video URL")
         
         # Ensure video metadata exists
-        video = get_video_by_id(video_id)
+        video = get_video_by_id(video_id, VIDEO_ID_FIELDS)
         if not video:
             metadata = process_video_metadata(request.video_url)
             if not metadata:
@@ -751,7 +767,7 @@ async def process_subtitles_endpoint(request: VideoRequest, current_user: dict =
             raise HTTPException(status_code=400, detail="Invalid video URL")
         
         # Ensure video metadata exists
-        video = get_video_by_id(video_id)
+        video = get_video_by_id(video_id, VIDEO_ID_FIELDS)
         if not video:
             metadata = process_video_metadata(request.video_url)
             if not metadata:
@@ -803,8 +819,7 @@ async def process_ai_enrichment_endpoint(request: VideoRequest, current_user: di
             raise HTTPException(status_code=400, detail="Invalid video URL")
         
         # Check if chunks exist
-        chunks = get_chunks_by_video(video_id)
-        if not chunks:
+        if not has_chunks(video_id):
             raise HTTPException(status_code=400, detail="No subtitle chunks found. Please process subtitles first.")
         
         # Process in background
@@ -893,14 +908,13 @@ async def process_video_all_chunks_ai_endpoint(
     """Process AI enrichment for all chunks of a video (background)"""
     try:
         # Verify video exists
-        video = get_video_by_id(request.video_id)
+        video = get_video_by_id(request.video_id, VIDEO_ID_FIELDS)
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
         
         # Check if video has chunks
-        from db.subtitle_chunks_crud import get_chunks_by_video
-        chunks = get_chunks_by_video(request.video_id)
-        if not chunks:
+        chunk_count = count_chunks(request.video_id)
+        if not chunk_count:
             raise HTTPException(status_code=400, detail="No chunks found for this video")
         
         # Process in background
@@ -921,9 +935,9 @@ async def process_video_all_chunks_ai_endpoint(
         thread.start()
         
         return {
-            "message": f"AI enrichment started for {len(chunks)} chunks",
+            "message": f"AI enrichment started for {chunk_count} chunks",
             "video_id": request.video_id,
-            "chunk_count": len(chunks),
+            "chunk_count": chunk_count,
             "status": "processing"
         }
         
@@ -1064,7 +1078,7 @@ async def process_video_no_auth(request: VideoRequest):
         if not video_id:
             raise HTTPException(status_code=400, detail="Invalid video URL")
         
-        video = get_video_by_id(video_id)
+        video = get_video_by_id(video_id, VIDEO_ID_FIELDS)
         if not video:
             metadata = process_video_metadata(request.video_url)
             if not metadata:
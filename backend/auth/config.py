@@ -8,6 +8,7 @@ Security Note:
 - The .verified_emails file (gitignored) contains email->hash mapping for reference only
 """
 
+import functools
 import hashlib
 
 # SHA-256 hashes of verified emails
@@ -21,6 +22,9 @@ VERIFIED_EMAIL_HASHES = [
     "4522e3c5008e3f5b1709cf0d4c229ddc0231c7e2cb368d3e68c4ae6170e1f434",
 ]
 
+# Set view of the list above for O(1) membership checks
+_VERIFIED_HASH_SET = frozenset(VERIFIED_EMAIL_HASHES)
+
 def hash_email(email: str) -> str:
     """
     Generate SHA-256 hash of an email address
@@ -31,7 +35,14 @@ def hash_email(email: str) -> str:
     Returns:
         SHA-256 hash of the lowercase email
     """
-    return hashlib.sha256(email.lower().encode()).hexdigest()
+    return _sha256_hex(email.lower())
+
+
+# The auth middleware hashes the caller's email on every request;
+# the set of distinct emails is tiny, so each is hashed only once
+@functools.lru_cache(maxsize=4096)
+def _sha256_hex(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
 
 
 def is_email_verified(email: str) -> bool:
@@ -45,4 +56,4 @@ def is_email_verified(email: str) -> bool:
         True if email is verified, False otherwise
     """
     email_hash = hash_email(email)
-    return email_hash in VERIFIED_EMAIL_HASHES
+    return email_hash in _VERIFIED_HASH_SET
@@ -11,6 +11,8 @@ Workflow:
 4. Keep .verified_emails in .gitignore for local reference only
 """
 
+import bisect
+import functools
 import hashlib
 import json
 import os
@@ -20,21 +22,42 @@ VERIFIED_EMAILS_FILE = os.path.join(os.path.dirname(__file__), '.verified_emails
 
 def hash_email(email: str) -> str:
     """Generate SHA-256 hash of an email"""
-    return hashlib.sha256(email.lower().encode()).hexdigest()
+    return _sha256_hex(email.lower())
+
+
+@functools.lru_cache(maxsize=4096)
+def _sha256_hex(value: str) -> str:
+    """Memoized digest - keyed on the lowercased email, so case variants share an entry"""
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def hash_emails_bulk(emails: list[str]) -> list[str]:
+    """Hash many emails in one pass (same digests as hash_email, without the per-call overhead)"""
+    sha256 = hashlib.sha256
+    lower = str.lower
+    return [sha256(lower(e).encode()).hexdigest() for e in emails]
 
 
 def load_verified_emails():
-    """Load existing verified emails data"""
+    """Load existing verified emails data as {'emails': [sorted emails]}"""
     if os.path.exists(VERIFIED_EMAILS_FILE):
         with open(VERIFIED_EMAILS_FILE, 'r') as f:
-            return json.load(f)
-    return {'emails': {}, 'hashes': []}
+            data = json.load(f)
+        # Older files stored {'emails': {email: hash}, 'hashes': []} - keep only the emails
+        return {'emails': sorted(set(data.get('emails', [])))}
+    return {'emails': []}
 
 
 def save_verified_emails(data):
-    """Save verified emails data"""
+    """Save verified emails data (hashes are derived from the emails, not stored)"""
     with open(VERIFIED_EMAILS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+        json.dump({'emails': data['emails']}, f, indent=2)
+
+
+def _find_email(emails: list[str], email: str) -> int:
+    """Index of email in the sorted list, or -1 if absent"""
+    i = bisect.bisect_left(emails, email)
+    return i if i < len(emails) and emails[i] == email else -1
 
 
 def add_email(email: str):
@@ -44,14 +67,14 @@ def add_email(email: str):
     
     data = load_verified_emails()
     
-    if email in data['emails']:
+    if _find_email(data['emails'], email) >= 0:
         print(f"✓ Email already in reference file: {email}")
         print(f"  Hash: {email_hash}")
         print(f"\n⚠️  Make sure this hash is in auth/config.py VERIFIED_EMAIL_HASHES:")
         print(f'     "{email_hash}",')
         return
     
-    data['emails'][email] = email_hash
+    bisect.insort(data['emails'], email)
     
     save_verified_emails(data)
     print(f"✓ Added to reference file: {email}")
@@ -67,9 +90,10 @@ def remove_email(email: str):
     
     data = load_verified_emails()
     
-    if email in data['emails']:
-        email_hash = data['emails'][email]
-        del data['emails'][email]
+    index = _find_email(data['emails'], email)
+    if index >= 0:
+        email_hash = hash_email(email)
+        del data['emails'][index]
         save_verified_emails(data)
         print(f"✓ Removed from reference file: {email}")
         print(f"\n⚠️  ACTION REQUIRED: Remove this hash from auth/config.py VERIFIED_EMAIL_HASHES:")
@@ -89,7 +113,7 @@ def list_emails():
     
     print("\nReference File - Email to Hash Mapping:")
     print("=" * 70)
-    for email, email_hash in data['emails'].items():
+    for email, email_hash in zip(data['emails'], hash_emails_bulk(data['emails'])):
         print(f"  {email}")
         print(f"    → {email_hash}")
     print(f"\nTotal: {len(data['emails'])} emails in reference file")
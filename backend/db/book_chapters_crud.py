@@ -3,28 +3,31 @@ CRUD operations for book chapters in Supabase (2nd database)
 Uses Supabase Storage for chapter text, DB for metadata
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from supabase import Client
+from postgrest.exceptions import APIError
+from .supabase_client import get_books_client, execute_with_retry
 from typing import Optional, Dict, Any, List
 from .book_chapters_storage import (
-    ensure_bucket_exists,
     upload_chapter_text,
     download_chapter_text,
     delete_book_chapters_from_storage,
     delete_chapter_from_storage
 )
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client for 2nd database - use SERVICE key for admin operations
-url: str = os.getenv("SUPABASE_URL_2")
-key: str = os.getenv("SUPABASE_SERVICE_KEY_2")
-supabase: Client = create_client(url, key)
+def _sb() -> Client:
+    """
+    Shared 2nd-database client (SERVICE key)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_books_client()
+
 
-# Ensure storage bucket exists on module load
-ensure_bucket_exists()
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.book_chapters_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def load_chapter_text(chapter: Dict[str, Any]) -> Dict[str, Any]:
@@ -105,7 +108,7 @@ def create_chapter(
         }
         
         print(f"[DB->] UPSERT book_chapters (book={book_id}, chapter={chapter_id}, storage={chapter_text_path})")
-        response = supabase.table("book_chapters").upsert(chapter_data).execute()
+        response = execute_with_retry(_sb().table("book_chapters").upsert(chapter_data))
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Upserted chapter {chapter_id} for book {book_id}")
@@ -132,7 +135,7 @@ def get_chapters_by_book(book_id: str) -> List[Dict[str, Any]]:
     """
     try:
         print(f"[DB->] SELECT book_chapters WHERE book_id={book_id}")
-        response = supabase.table("book_chapters").select("*").eq("book_id", book_id).order("chapter_id").execute()
+        response = _sb().table("book_chapters").select("*").eq("book_id", book_id).order("chapter_id").execute()
         
         if response.data:
             print(f"[DB<-] Found {len(response.data)} chapters")
@@ -159,7 +162,7 @@ def get_chapter_index(book_id: str) -> List[Dict[str, Any]]:
     """
     try:
         print(f"[DB->] SELECT chapter index WHERE book_id={book_id}")
-        response = supabase.table("book_chapters").select(
+        response = _sb().table("book_chapters").select(
             "chapter_id, chapter_title, ai_field_1"
         ).eq("book_id", book_id).order("chapter_id").execute()
         
@@ -189,7 +192,7 @@ def get_chapter_metadata(book_id: str, chapter_id: int) -> Optional[Dict[str, An
     """
     try:
         print(f"[DB->] SELECT chapter metadata WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters").select("*").eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
+        response = _sb().table("book_chapters").select("*").eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Found chapter {chapter_id} metadata")
@@ -217,7 +220,7 @@ def get_chapter_details(book_id: str, chapter_id: int, include_text: bool = True
     """
     try:
         print(f"[DB->] SELECT book_chapters WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters").select("*").eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
+        response = _sb().table("book_chapters").select("*").eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
         
         if response.data and len(response.data) > 0:
             chapter = response.data[0]
@@ -251,9 +254,9 @@ def update_chapter_note(book_id: str, chapter_id: int, note_content: str) -> Opt
     """
     try:
         print(f"[DB->] UPDATE book_chapters note WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters").update({
+        response = execute_with_retry(_sb().table("book_chapters").update({
             'note_content': note_content
-        }).eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
+        }).eq("book_id", book_id).eq("chapter_id", chapter_id))
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Updated note for chapter {chapter_id}")
@@ -302,7 +305,7 @@ def update_chapter_ai_fields(
             return None
         
         print(f"[DB->] UPDATE book_chapters AI fields WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters").update(update_data).eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
+        response = execute_with_retry(_sb().table("book_chapters").update(update_data).eq("book_id", book_id).eq("chapter_id", chapter_id))
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Updated AI fields for chapter {chapter_id}")
@@ -336,7 +339,7 @@ def delete_chapter(book_id: str, chapter_id: int) -> bool:
         
         # Delete from DB
         print(f"[DB->] DELETE book_chapters WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        supabase.table("book_chapters").delete().eq("book_id", book_id).eq("chapter_id", chapter_id).execute()
+        execute_with_retry(_sb().table("book_chapters").delete().eq("book_id", book_id).eq("chapter_id", chapter_id))
         print(f"[DB<-] Deleted chapter {chapter_id}")
         return True
         
@@ -361,7 +364,7 @@ def delete_all_chapters_for_book(book_id: str) -> bool:
         
         # Delete from DB
         print(f"[DB->] DELETE book_chapters WHERE book_id={book_id}")
-        supabase.table("book_chapters").delete().eq("book_id", book_id).execute()
+        execute_with_retry(_sb().table("book_chapters").delete().eq("book_id", book_id))
         print(f"[DB<-] Deleted all chapters for book {book_id}")
         return True
         
@@ -384,11 +387,10 @@ def update_chapter_title(book_id: str, chapter_id: int, chapter_title: str) -> O
     """
     try:
         print(f"[DB->] UPDATE book_chapters SET chapter_title WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters")\
+        response = execute_with_retry(_sb().table("book_chapters")\
             .update({"chapter_title": chapter_title})\
             .eq("book_id", book_id)\
-            .eq("chapter_id", chapter_id)\
-            .execute()
+            .eq("chapter_id", chapter_id))
         
         if not response.data or len(response.data) == 0:
             print(f"[DB!!] Chapter not found: {book_id}/{chapter_id}")
@@ -418,7 +420,7 @@ def update_chapter_text(book_id: str, chapter_id: int, chapter_text: str) -> Opt
     try:
         # Get existing chapter to find storage path
         print(f"[DB->] SELECT book_chapters WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters")\
+        response = _sb().table("book_chapters")\
             .select("*")\
             .eq("book_id", book_id)\
             .eq("chapter_id", chapter_id)\
@@ -443,11 +445,10 @@ def update_chapter_text(book_id: str, chapter_id: int, chapter_text: str) -> Opt
         
         # Update timestamp in DB
         print(f"[DB->] UPDATE book_chapters SET updated_at=NOW() WHERE book_id={book_id} AND chapter_id={chapter_id}")
-        response = supabase.table("book_chapters")\
+        response = execute_with_retry(_sb().table("book_chapters")\
             .update({"updated_at": "NOW()"})\
             .eq("book_id", book_id)\
-            .eq("chapter_id", chapter_id)\
-            .execute()
+            .eq("chapter_id", chapter_id))
         
         print(f"[DB<-] Updated chapter text for {book_id}/{chapter_id}")
         
@@ -467,6 +468,10 @@ def reorder_chapters(book_id: str, chapter_order: List[int]) -> bool:
     Storage paths (UUIDs) remain unchanged, ensuring file persistence
     Reindexes chapters sequentially starting from 1 (1-indexed)
     
+    Uses the reorder_chapters RPC (one round-trip, atomic - see
+    .db apply/reorder_chapters_rpc.sql); falls back to per-chapter
+    updates when the function isn't installed.
+    
     Args:
         book_id: Book identifier
         chapter_order: List of current chapter_ids in desired new order
@@ -474,10 +479,35 @@ def reorder_chapters(book_id: str, chapter_order: List[int]) -> bool:
     Returns:
         True if successful, False on error
     """
+    try:
+        print(f"[DB->] RPC reorder_chapters(p_book={book_id}, count={len(chapter_order)})")
+        # Not retried: a reorder whose response was lost may already have committed,
+        # and replaying it would apply the permutation twice
+        _sb().rpc(
+            "reorder_chapters",
+            {"p_book": book_id, "p_order": chapter_order}
+        ).execute()
+        
+        print(f"[DB<-] Reordered {len(chapter_order)} chapters for book {book_id} (1-indexed)")
+        return True
+        
+    except APIError as e:
+        # PGRST202: function not found - migration not applied yet
+        if e.code == "PGRST202":
+            return _reorder_chapters_row_by_row(book_id, chapter_order)
+        print(f"[DB!!] {str(e)}")
+        return False
+    except Exception as e:
+        print(f"[DB!!] {str(e)}")
+        return False
+
+
+def _reorder_chapters_row_by_row(book_id: str, chapter_order: List[int]) -> bool:
+    """reorder_chapters without the RPC: two UPDATEs per chapter via temporary negative ids"""
     try:
         # Get all chapters for this book
         print(f"[DB->] SELECT book_chapters WHERE book_id={book_id}")
-        response = supabase.table("book_chapters")\
+        response = _sb().table("book_chapters")\
             .select("*")\
             .eq("book_id", book_id)\
             .order("chapter_id")\
@@ -499,11 +529,10 @@ def reorder_chapters(book_id: str, chapter_order: List[int]) -> bool:
         print(f"[DB->] Setting temporary negative chapter_ids")
         for idx, old_id in enumerate(chapter_order):
             temp_id = -(idx + 1)
-            supabase.table("book_chapters")\
+            execute_with_retry(_sb().table("book_chapters")\
                 .update({"chapter_id": temp_id})\
                 .eq("book_id", book_id)\
-                .eq("chapter_id", old_id)\
-                .execute()
+                .eq("chapter_id", old_id))
         
         # Then update to final positions (1-indexed: 1, 2, 3, ...)
         # Note: chapter_text_path (UUID-based) remains unchanged during reordering
@@ -511,11 +540,10 @@ def reorder_chapters(book_id: str, chapter_order: List[int]) -> bool:
         for idx, old_id in enumerate(chapter_order):
             temp_id = -(idx + 1)
             new_id = idx + 1  # 1-indexed: start from 1
-            supabase.table("book_chapters")\
+            execute_with_retry(_sb().table("book_chapters")\
                 .update({"chapter_id": new_id, "updated_at": "NOW()"})\
                 .eq("book_id", book_id)\
-                .eq("chapter_id", temp_id)\
-                .execute()
+                .eq("chapter_id", temp_id))
         
         print(f"[DB<-] Reordered {len(chapter_order)} chapters for book {book_id} (1-indexed)")
         return True
@@ -3,47 +3,59 @@ Supabase Storage operations for book chapters (2nd database)
 Handles storing chapter text in storage bucket
 """
 
-import os
 import uuid
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from typing import Optional
+from .supabase_client import get_books_client
+from typing import Optional, Any
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client for 2nd database - use SERVICE key for storage operations
-url: str = os.getenv("SUPABASE_URL_2")
-key: str = os.getenv("SUPABASE_SERVICE_KEY_2")  # Use service key for admin operations
-supabase: Client = create_client(url, key)
+def _storage():
+    """Storage API of the shared 2nd-database client (SERVICE key), built on first use"""
+    return get_books_client().storage
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.book_chapters_storage import supabase` working for scripts
+    if name == "supabase":
+        return get_books_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 BUCKET_NAME = "book-chapters"
 
+# Set once the bucket is known to exist; checked lazily by the first upload
+_bucket_ready = False
+
 
 def ensure_bucket_exists() -> bool:
     """
     Ensure the book-chapters storage bucket exists
-    Creates it if it doesn't exist
+    Creates it if it doesn't exist; runs at most once per process
     
     Returns:
         True if bucket exists or was created, False on error
     """
+    global _bucket_ready
+    if _bucket_ready:
+        return True
+    
     try:
         # Try to get bucket
-        buckets = supabase.storage.list_buckets()
+        buckets = _storage().list_buckets()
         bucket_names = [b.name for b in buckets]
         
         if BUCKET_NAME in bucket_names:
             print(f"[STORAGE] Bucket '{BUCKET_NAME}' exists")
+            _bucket_ready = True
             return True
         
         # Create bucket if it doesn't exist
         print(f"[STORAGE] Creating bucket '{BUCKET_NAME}'")
-        supabase.storage.create_bucket(
+        _storage().create_bucket(
             BUCKET_NAME,
             options={"public": False}  # Private bucket
         )
         print(f"[STORAGE] Bucket '{BUCKET_NAME}' created")
+        _bucket_ready = True
         return True
         
     except Exception as e:
@@ -65,6 +77,9 @@ def upload_chapter_text(book_id: str, chapter_text: str, existing_path: Optional
         Storage path or None on error
     """
     try:
+        # Only writes need the bucket to exist (reads of a missing bucket just fail)
+        ensure_bucket_exists()
+        
         if existing_path:
             # Use existing path for updates
             file_path = existing_path
@@ -76,7 +91,7 @@ def upload_chapter_text(book_id: str, chapter_text: str, existing_path: Optional
         print(f"[STORAGE->] Uploading to {BUCKET_NAME}/{file_path}")
         
         # Upload or update file
-        supabase.storage.from_(BUCKET_NAME).upload(
+        _storage().from_(BUCKET_NAME).upload(
             file_path,
             chapter_text.encode('utf-8'),
             file_options={"content-type": "text/plain", "upsert": "true"}
@@ -103,7 +118,7 @@ def download_chapter_text(file_path: str) -> Optional[str]:
     try:
         print(f"[STORAGE->] Downloading {BUCKET_NAME}/{file_path}")
         
-        response = supabase.storage.from_(BUCKET_NAME).download(file_path)
+        response = _storage().from_(BUCKET_NAME).download(file_path)
         
         if response:
             text = response.decode('utf-8')
@@ -131,7 +146,7 @@ def delete_book_chapters_from_storage(book_id: str) -> bool:
     try:
         # List all files in the book's folder
         print(f"[STORAGE->] Listing files for book {book_id}")
-        files = supabase.storage.from_(BUCKET_NAME).list(book_id)
+        files = _storage().from_(BUCKET_NAME).list(book_id)
         
         if not files:
             print(f"[STORAGE<-] No files found for book {book_id}")
@@ -140,7 +155,7 @@ def delete_book_chapters_from_storage(book_id: str) -> bool:
         # Delete each file
         file_paths = [f"{book_id}/{f['name']}" for f in files]
         print(f"[STORAGE->] Deleting {len(file_paths)} files")
-        supabase.storage.from_(BUCKET_NAME).remove(file_paths)
+        _storage().from_(BUCKET_NAME).remove(file_paths)
         
         print(f"[STORAGE<-] Deleted files for book {book_id}")
         return True
@@ -162,7 +177,7 @@ def delete_chapter_from_storage(file_path: str) -> bool:
     """
     try:
         print(f"[STORAGE->] Deleting {BUCKET_NAME}/{file_path}")
-        supabase.storage.from_(BUCKET_NAME).remove([file_path])
+        _storage().from_(BUCKET_NAME).remove([file_path])
         print(f"[STORAGE<-] Deleted {file_path}")
         return True
         
@@ -3,18 +3,24 @@ CRUD operations for book notes in Supabase (2nd database)
 Handles user notes for books
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from supabase import Client
+from .supabase_client import get_books_client, execute_with_retry, upsert_and_get
 from typing import Optional, Dict, Any, List
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client for 2nd database - use SERVICE key for admin operations
-url: str = os.getenv("SUPABASE_URL_2")
-key: str = os.getenv("SUPABASE_SERVICE_KEY_2")
-supabase: Client = create_client(url, key)
+def _sb() -> Client:
+    """
+    Shared 2nd-database client (SERVICE key)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_books_client()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.book_notes_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def create_or_update_note(
@@ -41,11 +47,11 @@ def create_or_update_note(
         }
         
         print(f"[DB->] UPSERT book_notes (book={book_id})")
-        response = supabase.table("book_notes").upsert(note_data).execute()
+        note = upsert_and_get(_sb().table("book_notes"), note_data, 'book_id')
         
-        if response.data and len(response.data) > 0:
+        if note:
             print(f"[DB<-] Upserted note for book {book_id}")
-            return response.data[0]
+            return note
         else:
             print(f"[DB!!] Failed to upsert note")
             return None
@@ -67,7 +73,7 @@ def get_note_by_book_id(book_id: str) -> Optional[Dict[str, Any]]:
     """
     try:
         print(f"[DB->] SELECT book_notes WHERE book_id={book_id}")
-        response = supabase.table("book_notes").select("*").eq("book_id", book_id).execute()
+        response = _sb().table("book_notes").select("*").eq("book_id", book_id).execute()
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Found note for book {book_id}")
@@ -93,7 +99,7 @@ def get_notes_with_book_info(limit: int = 100) -> List[Dict[str, Any]]:
     """
     try:
         print(f"[DB->] SELECT book_notes JOIN books LIMIT {limit}")
-        response = supabase.table("book_notes").select(
+        response = _sb().table("book_notes").select(
             "*, books(id, title, author, created_at)"
         ).limit(limit).order("updated_at", desc=True).execute()
         
@@ -121,7 +127,7 @@ def delete_note(book_id: str) -> bool:
     """
     try:
         print(f"[DB->] DELETE book_notes WHERE book_id={book_id}")
-        supabase.table("book_notes").delete().eq("book_id", book_id).execute()
+        execute_with_retry(_sb().table("book_notes").delete().eq("book_id", book_id))
         print(f"[DB<-] Deleted note for book {book_id}")
         return True
         
@@ -3,19 +3,56 @@ CRUD operations for books in Supabase (2nd database)
 Handles storing and retrieving book metadata
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from supabase import Client
+from .supabase_client import get_books_client, execute_with_retry
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client for 2nd database - use SERVICE key for admin operations
-url: str = os.getenv("SUPABASE_URL_2")
-key: str = os.getenv("SUPABASE_SERVICE_KEY_2")
-supabase: Client = create_client(url, key)
+def _sb() -> Client:
+    """
+    Shared 2nd-database client (SERVICE key)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_books_client()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.books_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _build_book_row(
+    book_id: str,
+    title: str,
+    author: Optional[str] = None,
+    publisher: Optional[str] = None,
+    publication_year: Optional[int] = None,
+    isbn: Optional[str] = None,
+    description: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    book_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a books table row from book metadata
+    Shared by create_book and upsert_book so both write the same shape
+    
+    Returns:
+        Dictionary formatted for database insertion
+    """
+    return {
+        'id': book_id,
+        'title': title,
+        'author': author,
+        'publisher': publisher,
+        'publication_year': publication_year,
+        'isbn': isbn,
+        'description': description,
+        'tags': tags or [],
+        'type': book_type or 'book'
+    }
 
 
 def create_book(
@@ -47,20 +84,13 @@ def create_book(
         Created book record or None on error
     """
     try:
-        book_data = {
-            'id': book_id,
-            'title': title,
-            'author': author,
-            'publisher': publisher,
-            'publication_year': publication_year,
-            'isbn': isbn,
-            'description': description,
-            'tags': tags or [],
-            'type': book_type or 'book'
-        }
+        book_data = _build_book_row(
+            book_id, title, author, publisher, publication_year,
+            isbn, description, tags, book_type
+        )
         
         print(f"[DB->] INSERT books (id={book_id}, type={book_type or 'book'})")
-        response = supabase.table("books").insert(book_data).execute()
+        response = _sb().table("books").insert(book_data).execute()
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Created book {book_id}")
@@ -81,6 +111,60 @@ def create_book(
         return None
 
 
+def upsert_book(
+    book_id: str,
+    title: str,
+    author: Optional[str] = None,
+    publisher: Optional[str] = None,
+    publication_year: Optional[int] = None,
+    isbn: Optional[str] = None,
+    description: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    book_type: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Create a book or overwrite an existing one in a single round trip
+    Uses INSERT ... ON CONFLICT (id) DO UPDATE, so re-running an import
+    doesn't need create_book -> duplicate key error -> update_book
+    
+    Args:
+        book_id: User-provided short identifier (e.g., 'the_subtle_art')
+        title: Book title
+        author: Book author
+        publisher: Publisher name
+        publication_year: Year of publication
+        isbn: ISBN number
+        description: Book description
+        tags: List of tags
+        book_type: Type of book ('book', 'lecture', etc.) - defaults to 'book'
+        
+    Returns:
+        Created/updated book record or None on error
+    """
+    try:
+        book_data = _build_book_row(
+            book_id, title, author, publisher, publication_year,
+            isbn, description, tags, book_type
+        )
+        
+        print(f"[DB->] UPSERT books (id={book_id}, type={book_type or 'book'})")
+        response = execute_with_retry(_sb().table("books").upsert(
+            book_data,
+            on_conflict='id'
+        ))
+        
+        if response.data and len(response.data) > 0:
+            print(f"[DB<-] Upserted book {book_id}")
+            return response.data[0]
+        else:
+            print("[DB!!] Failed to upsert book")
+            return None
+            
+    except Exception as e:
+        print(f"[DB!!] {str(e)}")
+        return None
+
+
 def get_book_by_id(book_id: str) -> Optional[Dict[str, Any]]:
     """
     Get book by ID
@@ -93,7 +177,7 @@ def get_book_by_id(book_id: str) -> Optional[Dict[str, Any]]:
     """
     try:
         print(f"[DB->] SELECT books WHERE id={book_id}")
-        response = supabase.table("books").select("*").eq("id", book_id).execute()
+        response = _sb().table("books").select("*").eq("id", book_id).execute()
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Found book {book_id}")
@@ -107,19 +191,22 @@ def get_book_by_id(book_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_all_books(limit: int = 100) -> List[Dict[str, Any]]:
+def get_all_books(limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Get all books (most recently updated first)
     
     Args:
         limit: Maximum number of books to return
+        offset: Number of books to skip
         
     Returns:
         List of book records
     """
     try:
-        print(f"[DB->] SELECT books LIMIT {limit}")
-        response = supabase.table("books").select("*").limit(limit).order('updated_at', desc=True).execute()
+        print(f"[DB->] SELECT books (limit={limit}, offset={offset})")
+        response = _sb().table("books").select("*").order(
+            'updated_at', desc=True
+        ).range(offset, offset + limit - 1).execute()
         
         if response.data:
             print(f"[DB<-] Found {len(response.data)} books")
@@ -182,7 +269,7 @@ def update_book(
             return None
         
         print(f"[DB->] UPDATE books WHERE id={book_id}")
-        response = supabase.table("books").update(update_data).eq("id", book_id).execute()
+        response = execute_with_retry(_sb().table("books").update(update_data).eq("id", book_id))
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Updated book {book_id}")
@@ -221,7 +308,9 @@ def update_book_id(old_book_id: str, new_book_id: str) -> bool:
             return False
         
         print(f"[DB->] UPDATE books SET id={new_book_id} WHERE id={old_book_id}")
-        response = supabase.table("books").update({"id": new_book_id}).eq("id", old_book_id).execute()
+        # Not retried: after a lost response the row is already renamed, so a
+        # retry would match nothing and report a successful rename as failed
+        response = _sb().table("books").update({"id": new_book_id}).eq("id", old_book_id).execute()
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Updated book ID from {old_book_id} to {new_book_id}")
@@ -258,7 +347,7 @@ def delete_book(book_id: str) -> bool:
         # Step 2: Delete book from DB (cascades to book_chapters, but NOT book_notes)
         print(f"[DELETE] Step 2: Deleting book record {book_id}")
         print(f"[DB->] DELETE books WHERE id={book_id}")
-        response = supabase.table("books").delete().eq("id", book_id).execute()
+        response = execute_with_retry(_sb().table("books").delete().eq("id", book_id))
         
         print(f"[DB<-] Deleted book {book_id} (book_notes preserved if they exist)")
         return True
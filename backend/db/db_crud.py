@@ -3,18 +3,25 @@ Simple CRUD operations test for Supabase
 Using: Supabase Python Client Library (recommended for persistent apps)
 """
 
-import os
 import re
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from supabase import Client
+from .supabase_client import get_service_client, execute_with_retry
+from typing import Any
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client with SERVICE ROLE key (server-only, bypasses RLS)
-url: str = os.getenv("SUPABASE_URL")
-key: str = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(url, key)
+def _sb() -> Client:
+    """
+    Shared SERVICE ROLE client (server-only, bypasses RLS)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_service_client()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.db_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def validate_book_id(book_id: str) -> bool:
@@ -39,7 +46,7 @@ def validate_book_id(book_id: str) -> bool:
 def create_note(title: str, content: str):
     """Create a new note"""
     try:
-        response = supabase.table("notes").insert({
+        response = _sb().table("notes").insert({
             "title": title,
             "content": content
         }).execute()
@@ -53,7 +60,7 @@ def create_note(title: str, content: str):
 def read_notes():
     """Read all notes"""
     try:
-        response = supabase.table("notes").select("*").execute()
+        response = _sb().table("notes").select("*").execute()
         print(f"✅ Read {len(response.data)} notes:")
         for note in response.data:
             print(f"   ID: {note.get('id')} | Title: {note.get('title')}")
@@ -72,7 +79,7 @@ def update_note(note_id: int, title: str = None, content: str = None):
         if content:
             update_data["content"] = content
         
-        response = supabase.table("notes").update(update_data).eq("id", note_id).execute()
+        response = execute_with_retry(_sb().table("notes").update(update_data).eq("id", note_id))
         print(f"✅ Updated: {response.data}")
         return response.data
     except Exception as e:
@@ -83,7 +90,7 @@ def update_note(note_id: int, title: str = None, content: str = None):
 def delete_note(note_id: int):
     """Delete a note"""
     try:
-        response = supabase.table("notes").delete().eq("id", note_id).execute()
+        response = execute_with_retry(_sb().table("notes").delete().eq("id", note_id))
         print(f"✅ Deleted note with ID: {note_id}")
         return response.data
     except Exception as e:
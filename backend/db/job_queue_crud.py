@@ -3,19 +3,100 @@ CRUD operations for job queue in Supabase
 Handles background processing job management
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import asyncio
+from supabase import Client
+from .supabase_client import get_service_client, execute_with_retry, create_pg_pool
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client with SERVICE ROLE key (server-only, bypasses RLS)
-url: str = os.getenv("SUPABASE_URL")
-key: str = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(url, key)
+def _sb() -> Client:
+    """
+    Shared SERVICE ROLE client (server-only, bypasses RLS)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_service_client()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.job_queue_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Optional direct Postgres connection for the hottest write paths
+# (the fast paths fall back to PostgREST when it's unavailable)
+_pg_pool = None
+_pg_pool_lock = asyncio.Lock()
+
+# Sized for Supabase's Transaction Pooler (port 6543): a few server connections
+# are multiplexed between clients, so keep the pool small and recycle idle ones
+PG_POOL_MIN_SIZE = 1
+PG_POOL_MAX_SIZE = 5
+PG_POOL_MAX_IDLE_SECONDS = 1800
+
+UPDATE_JOB_STATUS_SQL = """
+    UPDATE job_queue SET
+        status = $1::job_status,
+        started_at = CASE WHEN $1::job_status = 'processing' THEN $2 ELSE started_at END,
+        completed_at = CASE WHEN $1::job_status IN ('completed', 'failed') THEN $2 ELSE completed_at END,
+        error_message = COALESCE($3, error_message)
+    WHERE id = $4
+    RETURNING *
+"""
+
+INCREMENT_JOB_ATTEMPTS_SQL = """
+    UPDATE job_queue SET
+        attempts = attempts + 1,
+        status = CASE WHEN attempts + 1 >= max_attempts THEN 'failed' ELSE status END,
+        error_message = CASE WHEN attempts + 1 >= max_attempts
+            THEN 'Max attempts (' || max_attempts || ') reached' ELSE error_message END,
+        completed_at = CASE WHEN attempts + 1 >= max_attempts THEN $1 ELSE completed_at END
+    WHERE id = $2
+    RETURNING *
+"""
+
+
+async def get_pg_pool():
+    """
+    Get (or lazily create) the asyncpg pool for direct Postgres writes
+    
+    Returns:
+        asyncpg pool, or None if asyncpg/SUPABASE_DB_URL are unavailable
+    """
+    global _pg_pool
+    
+    if _pg_pool is not None:
+        return _pg_pool
+    
+    # Concurrent first callers wait here so only one pool is ever opened
+    async with _pg_pool_lock:
+        if _pg_pool is not None:
+            return _pg_pool
+        
+        try:
+            _pg_pool = await create_pg_pool(
+                min_size=PG_POOL_MIN_SIZE,
+                max_size=PG_POOL_MAX_SIZE,
+                max_idle_seconds=PG_POOL_MAX_IDLE_SECONDS
+            )
+            if _pg_pool is not None:
+                print(f"[DB<-] Opened asyncpg pool (min={PG_POOL_MIN_SIZE}, max={PG_POOL_MAX_SIZE})")
+            return _pg_pool
+        except Exception as e:
+            print(f"[DB!!] {str(e)}")
+            return None
+
+
+async def close_pg_pool() -> None:
+    """Close the asyncpg pool (api.py calls this on application shutdown)"""
+    global _pg_pool
+    
+    async with _pg_pool_lock:
+        if _pg_pool is not None:
+            await _pg_pool.close()
+            _pg_pool = None
 
 
 def create_job(
@@ -46,7 +127,7 @@ def create_job(
         }
         
         print(f"[DB->] INSERT job_queue (type={job_type}, video={video_id})")
-        response = supabase.table("job_queue").insert(job_data).execute()
+        response = _sb().table("job_queue").insert(job_data).execute()
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Created job: {job_type} (ID: {response.data[0]['id']})")
@@ -69,7 +150,7 @@ def get_next_job() -> Optional[Dict[str, Any]]:
     """
     try:
         print(f"[DB->] SELECT job_queue WHERE status=pending (limit=1, priority DESC)")
-        response = supabase.table("job_queue").select(
+        response = _sb().table("job_queue").select(
             "*"
         ).eq("status", "pending").order(
             "priority", desc=True
@@ -115,9 +196,9 @@ def update_job_status(
             update_data['error_message'] = error_message
         
         print(f"[DB->] UPDATE job_queue (id={job_id}, status={status})")
-        response = supabase.table("job_queue").update(
+        response = execute_with_retry(_sb().table("job_queue").update(
             update_data
-        ).eq("id", job_id).execute()
+        ).eq("id", job_id))
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Updated job {job_id} status to: {status}")
@@ -144,7 +225,7 @@ def increment_job_attempts(job_id: int) -> Optional[Dict[str, Any]]:
     try:
         # Get current attempts
         print(f"[DB->] SELECT job_queue WHERE id={job_id}")
-        response = supabase.table("job_queue").select(
+        response = _sb().table("job_queue").select(
             "attempts, max_attempts"
         ).eq("id", job_id).execute()
         
@@ -166,9 +247,9 @@ def increment_job_attempts(job_id: int) -> Optional[Dict[str, Any]]:
             update_data['completed_at'] = datetime.utcnow().isoformat()
         
         print(f"[DB->] UPDATE job_queue (id={job_id}, attempts={new_attempts})")
-        response = supabase.table("job_queue").update(
+        response = execute_with_retry(_sb().table("job_queue").update(
             update_data
-        ).eq("id", job_id).execute()
+        ).eq("id", job_id))
         
         if response.data and len(response.data) > 0:
             print(f"[DB<-] Incremented job attempts to {new_attempts}")
@@ -182,21 +263,141 @@ def increment_job_attempts(job_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_jobs_by_video(video_id: str) -> List[Dict[str, Any]]:
+async def update_job_status_fast(
+    job_id: int,
+    status: str,
+    error_message: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Update job status via a prepared statement on the direct Postgres pool
+    Skips the PostgREST JSON layer; falls back to update_job_status if the
+    pool is unavailable or the statement fails (e.g. the job_status enum
+    migration isn't applied yet)
+    
+    Args:
+        job_id: Job ID
+        status: New status (pending, processing, completed, failed)
+        error_message: Optional error message
+        
+    Returns:
+        Updated job record or None on error
+    """
+    pool = await get_pg_pool()
+    if pool is None:
+        return update_job_status(job_id, status, error_message)
+    
+    try:
+        print(f"[DB->] UPDATE job_queue via asyncpg (id={job_id}, status={status})")
+        row = await pool.fetchrow(
+            UPDATE_JOB_STATUS_SQL, status, datetime.utcnow(), error_message, job_id
+        )
+        
+        if row:
+            print(f"[DB<-] Updated job {job_id} status to: {status}")
+            return dict(row)
+        else:
+            print(f"[DB!!] Failed to update job {job_id}")
+            return None
+            
+    except Exception as e:
+        print(f"[DB!!] {str(e)}, falling back to PostgREST")
+        return update_job_status(job_id, status, error_message)
+
+
+async def update_jobs_status_fast(
+    job_ids: List[int],
+    status: str,
+    error_message: Optional[str] = None
+) -> int:
+    """
+    Update status for a batch of jobs in one pipelined round trip
+    Uses executemany on a single pooled connection so the N UPDATEs share
+    one network stream instead of N round trips. Rows are not returned and
+    the order in which they are applied is not guaranteed.
+    
+    Args:
+        job_ids: Job IDs to update
+        status: New status (pending, processing, completed, failed)
+        error_message: Optional error message applied to every job
+        
+    Returns:
+        Number of jobs submitted for update
+    """
+    if not job_ids:
+        return 0
+    
+    pool = await get_pg_pool()
+    if pool is None:
+        return sum(1 for job_id in job_ids if update_job_status(job_id, status, error_message))
+    
+    try:
+        now = datetime.utcnow()
+        print(f"[DB->] BULK UPDATE job_queue via asyncpg (count={len(job_ids)}, status={status})")
+        await pool.executemany(
+            UPDATE_JOB_STATUS_SQL,
+            [(status, now, error_message, job_id) for job_id in job_ids]
+        )
+        
+        print(f"[DB<-] Updated {len(job_ids)} jobs to: {status}")
+        return len(job_ids)
+        
+    except Exception as e:
+        # Same statement as update_job_status_fast - fails the same way without the enum
+        print(f"[DB!!] {str(e)}, falling back to PostgREST")
+        return sum(1 for job_id in job_ids if update_job_status(job_id, status, error_message))
+
+
+async def increment_job_attempts_fast(job_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Increment job attempt count in a single statement on the direct Postgres pool
+    Replaces the SELECT + UPDATE pair of increment_job_attempts; falls back
+    to it if the pool is unavailable
+    
+    Args:
+        job_id: Job ID
+        
+    Returns:
+        Updated job record or None on error
+    """
+    pool = await get_pg_pool()
+    if pool is None:
+        return increment_job_attempts(job_id)
+    
+    try:
+        print(f"[DB->] UPDATE job_queue attempts via asyncpg (id={job_id})")
+        row = await pool.fetchrow(INCREMENT_JOB_ATTEMPTS_SQL, datetime.utcnow(), job_id)
+        
+        if row:
+            print(f"[DB<-] Incremented job attempts to {row['attempts']}")
+            return dict(row)
+        else:
+            print(f"[DB<-] Job not found: {job_id}")
+            return None
+            
+    except Exception as e:
+        print(f"[DB!!] {str(e)}")
+        return None
+
+
+def get_jobs_by_video(video_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
     """
-    Get all jobs for a video
+    Get jobs for a video (most recent first)
     
     Args:
         video_id: YouTube video ID
+        limit: Maximum number of jobs to return
+        offset: Number of jobs to skip
         
     Returns:
         List of job records
     """
     try:
-        print(f"[DB->] SELECT job_queue WHERE video_id={video_id}")
-        response = supabase.table("job_queue").select(
+        print(f"[DB->] SELECT job_queue WHERE video_id={video_id} (limit={limit}, offset={offset})")
+        response = _sb().table("job_queue").select(
             "*"
-        ).eq("video_id", video_id).order("created_at", desc=True).execute()
+        ).eq("video_id", video_id).order("created_at", desc=True).range(
+            offset, offset + limit - 1
+        ).execute()
         
         print(f"[DB<-] Found {len(response.data) if response.data else 0} jobs")
         return response.data if response.data else []
@@ -224,7 +425,7 @@ def get_job_stats() -> Dict[str, int]:
         
         print(f"[DB->] SELECT job_queue stats (count by status)")
         for status in ['pending', 'processing', 'completed', 'failed']:
-            response = supabase.table("job_queue").select(
+            response = _sb().table("job_queue").select(
                 "id", count="exact"
             ).eq("status", status).execute()
             
@@ -254,9 +455,9 @@ def cleanup_old_jobs(days: int = 7) -> int:
         cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
         
         print(f"[DB->] DELETE job_queue WHERE status IN (completed,failed) AND completed_at < {cutoff_date}")
-        response = supabase.table("job_queue").delete().in_(
+        response = execute_with_retry(_sb().table("job_queue").delete().in_(
             "status", ["completed", "failed"]
-        ).lt("completed_at", cutoff_date).execute()
+        ).lt("completed_at", cutoff_date))
         
         deleted_count = len(response.data) if response.data else 0
         print(f"[DB<-] Cleaned up {deleted_count} old jobs")
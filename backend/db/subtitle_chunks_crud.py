@@ -3,42 +3,300 @@ CRUD operations for subtitle chunks in Supabase
 Uses Supabase Storage for chunk text, DB for metadata and AI fields
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from typing import Optional, Dict, Any, List
+import asyncio
+import functools
+import itertools
+import logging
+import threading
+from concurrent.futures import Future, as_completed
+from supabase import Client, AsyncClient
+from postgrest.exceptions import APIError
+from typing import Optional, Dict, Any, List, Tuple
+from .supabase_client import get_service_client, get_async_service_client, execute_with_retry
+from .ttl_cache import TTLCache, MISSING
 from .subtitle_chunks_storage import (
     ensure_bucket_exists,
     upload_chunk_text,
+    submit_chunk_text_upload,
     download_chunk_text,
+    download_chunk_texts,
+    chunk_text_path_for,
     delete_video_chunks_from_storage,
+    delete_chunk_files_from_storage,
     delete_chunk_from_storage
 )
 
-# Load environment variables
-load_dotenv()
+# DB trace logging - DEBUG level, so the hot paths skip formatting unless enabled
+log = logging.getLogger("db.chunks")
 
-# Initialize Supabase client with SERVICE ROLE key (server-only, bypasses RLS)
-url: str = os.getenv("SUPABASE_URL")
-key: str = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(url, key)
 
-# Ensure storage bucket exists on module load
-ensure_bucket_exists()
+@functools.lru_cache(maxsize=1)
+def _sb() -> Client:
+    """
+    Supabase client with SERVICE ROLE key (server-only, bypasses RLS)
+    Built on first use so importing this module does no .env / network I/O
+    """
+    client = get_service_client()
+    
+    # Ensure storage bucket exists before the first chunk write/read
+    ensure_bucket_exists()
+    return client
+
+
+@functools.lru_cache(maxsize=1)
+def _chunks():
+    """
+    Request builder for the subtitle_chunks table, built once
+    Safe to share: select/insert/upsert/update/delete each start a fresh
+    request, so only the table URL/headers are reused (filters are not)
+    """
+    return _sb().table("subtitle_chunks")
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.subtitle_chunks_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _ChunkUpsertLoader:
+    """
+    DataLoader-style coalescer for single-row chunk upserts
+    Rows submitted by concurrent create_chunk calls within a short window
+    are flushed together as one PostgREST upsert; each caller blocks on a
+    Future that resolves to its own row
+    """
+    
+    def __init__(
+        self,
+        on_conflict: str = "",
+        flush_delay: float = 0.005,
+        flush_size: int = 500,
+        max_batch: int = 1000
+    ):
+        self.on_conflict = on_conflict  # Conflict target passed to upsert
+        self.flush_delay = flush_delay  # Seconds to wait for more rows
+        self.flush_size = flush_size    # Flush immediately at this many queued rows
+        self.max_batch = max_batch      # Rows per request (stay under PostgREST limits)
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Dict[str, Any], Future]] = []
+        self._timer: Optional[threading.Timer] = None
+    
+    def load(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queue a row and block until its batch has been upserted"""
+        future: Future = Future()
+        batch = None
+        
+        with self._lock:
+            self._pending.append((row, future))
+            if len(self._pending) >= self.flush_size:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self._flush_pending)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        if batch:
+            self._flush(batch)
+        return future.result()
+    
+    def _take_pending(self) -> List[Tuple[Dict[str, Any], Future]]:
+        """Detach the queued rows (caller must hold the lock)"""
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+    
+    def _flush_pending(self) -> None:
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._flush(batch)
+    
+    def _flush(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        # Rows in one upsert must share columns, otherwise missing
+        # columns would be written as NULL - group partial rows by shape
+        groups: Dict[Tuple[str, ...], List[Tuple[Dict[str, Any], Future]]] = {}
+        for row, future in batch:
+            groups.setdefault(tuple(sorted(row)), []).append((row, future))
+        
+        for group in groups.values():
+            for start in range(0, len(group), self.max_batch):
+                self._flush_part(group[start:start + self.max_batch])
+    
+    def _flush_part(self, part: List[Tuple[Dict[str, Any], Future]]) -> None:
+        # Last write wins - a single upsert can't touch the same row twice
+        rows = {(row['video_id'], row['chunk_id']): row for row, _ in part}
+        
+        try:
+            written = self._write(list(rows.values()))
+            
+            # One chunk index refresh per video per flushed batch, not per caller
+            for video_id in self._index_videos(list(rows.values())):
+                refresh_chunk_index(video_id)
+            
+            by_key = {(r['video_id'], r['chunk_id']): r for r in written}
+            for row, future in part:
+                future.set_result(by_key.get((row['video_id'], row['chunk_id'])))
+        except Exception as e:
+            for _, future in part:
+                future.set_exception(e)
+    
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send one batch and return the written rows"""
+        log.debug("[DB->] UPSERT subtitle_chunks (coalesced, count=%s)", len(rows))
+        response = execute_with_retry(_chunks().upsert(
+            rows,
+            on_conflict=self.on_conflict,
+            returning="representation"  # create_chunk returns the row
+        ))
+        return response.data or []
+    
+    def _index_videos(self, rows: List[Dict[str, Any]]) -> set:
+        """Videos whose chunk index a written batch changed (new chunks)"""
+        return {row['video_id'] for row in rows}
+
+
+class _AiFieldsUpdateLoader(_ChunkUpsertLoader):
+    """
+    Coalescer for partial {video_id, chunk_id, <AI fields>} rows
+    Writes with UPDATE semantics, so a missing chunk resolves to None
+    instead of being inserted
+    """
+    
+    def _flush(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        # The update RPC handles mixed column sets, so no shape grouping
+        for start in range(0, len(batch), self.max_batch):
+            self._flush_part(batch[start:start + self.max_batch])
+    
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return _update_ai_fields_rows(rows)
+    
+    def _index_videos(self, rows: List[Dict[str, Any]]) -> set:
+        # Only short_title is part of the index
+        return {row['video_id'] for row in rows if 'short_title' in row}
+
+
+_chunk_upsert_loader = _ChunkUpsertLoader()
+
+# Partial {video_id, chunk_id, <AI fields>} rows from update_chunk_ai_fields
+_ai_fields_loader = _AiFieldsUpdateLoader()
+
+# Column projections (avoid SELECT * on the wire)
+CHUNK_COLUMNS = (
+    "video_id, chunk_id, chunk_text_path, chunk_text_inline, short_title, "
+    "ai_field_1, ai_field_2, ai_field_3, note_content, updated_at"
+)
+CHUNK_STATUS_COLUMNS = "chunk_id, short_title, ai_field_1, ai_field_2, ai_field_3"
+CHUNK_METADATA_COLUMNS = "video_id, chunk_id, chunk_text_path, chunk_text_inline, short_title"
+CHUNK_AI_FIELDS = ('short_title', 'ai_field_1', 'ai_field_2', 'ai_field_3')
+
+# Chunk texts shorter than this (UTF-8 bytes) are stored in the row's chunk_text_inline
+# column instead of Storage, so reading them needs no Storage round-trip
+# (see .db apply/chunk_text_inline.sql)
+INLINE_TEXT_MAX_BYTES = 4096
+
+# bulk_create_chunks inputs larger than this are written after all uploads finish,
+# through the ingest_chunks RPC (one set-based INSERT per batch)
+INGEST_RPC_THRESHOLD = 200
+
+# bulk_create_chunks writes finished uploads in batches of this size while others upload
+BULK_FLUSH_SIZE = 50
+
+# In-process read caches keyed by (function name, video_id[, chunk_id])
+# Chunk data only changes on ingest/AI/note writes, which evict the video's keys
+# The small index lives in its own cache so large row lists can't evict it
+# get_chunks_by_video serves entries up to 10 min past expiry while it refreshes
+_chunk_reads = TTLCache(maxsize=2048, ttl=300, stale_ttl=600)
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+# Videos whose chunk texts were recently prefetched by get_chunk_details
+_prefetched_videos = TTLCache(maxsize=256, ttl=600)
+_chunk_index_reads = TTLCache(maxsize=2048, ttl=300)
+
+# Per-video write generation, bumped by invalidate_video (like PageCache's):
+# a read snapshots it before querying and only caches its rows if no write
+# invalidated the video meanwhile
+_video_generations: Dict[str, int] = {}
+_generation_lock = threading.Lock()
+
+
+def _video_generation(video_id: str) -> int:
+    """Current write generation of a video (snapshot before a cached read's query)"""
+    return _video_generations.get(video_id, 0)
+
+
+def _cache_if_current(cache: TTLCache, key: Tuple, video_id: str, generation: int, value: Any) -> None:
+    """Store a read in cache unless the video was invalidated after generation was taken"""
+    with _generation_lock:
+        if _video_generations.get(video_id, 0) == generation:
+            cache.set(key, value)
+
+
+def invalidate_video(video_id: str) -> None:
+    """
+    Evict all cached chunk reads for a video
+    Called by every chunk write; also usable by upstream callbacks
+    
+    Args:
+        video_id: YouTube video ID
+    """
+    with _generation_lock:
+        _video_generations[video_id] = _video_generations.get(video_id, 0) + 1
+    _chunk_reads.invalidate(lambda cache_key: cache_key[1] == video_id)
+    _chunk_index_reads.invalidate(lambda cache_key: cache_key[1] == video_id)
+
+
+def refresh_chunk_index(video_id: str) -> bool:
+    """
+    Rewrite a video's rows in the chunk_index_cache table read by get_chunk_index
+    Call after writes that add/remove chunks or change short_title
+    
+    Args:
+        video_id: YouTube video ID that was written
+        
+    Returns:
+        True if refreshed, False otherwise
+    """
+    try:
+        log.debug("[DB->] RPC refresh_chunk_index(vid=%s)", video_id)
+        _sb().rpc("refresh_chunk_index", {"vid": video_id}).execute()
+        return True
+    except APIError as e:
+        # PGRST202: function not found - get_chunk_index reads subtitle_chunks instead
+        if e.code == "PGRST202":
+            log.debug("[DB<-] refresh_chunk_index not installed, skipping")
+        else:
+            log.error("[DB!!] %s", e)
+        return False
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return False
+
+
+def is_inline_text(chunk_text: str) -> bool:
+    """Whether a chunk text is small enough to live in the DB row (chunk_text_inline)"""
+    return len(chunk_text.encode('utf-8')) < INLINE_TEXT_MAX_BYTES
 
 
 def load_chunk_text(chunk: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Load chunk text from storage and add it to the chunk dict
+    Load chunk text (inline column, else storage) and add it to the chunk dict
     Modifies chunk in-place and returns it
     
     Args:
-        chunk: Chunk dictionary with chunk_text_path
+        chunk: Chunk dictionary with chunk_text_inline and/or chunk_text_path
         
     Returns:
-        Chunk dictionary with chunk_text added
+        Chunk dictionary with chunk_text added (chunk_text_inline removed)
     """
-    if chunk.get('chunk_text_path'):
+    inline = chunk.pop('chunk_text_inline', None)
+    if inline is not None:
+        chunk['chunk_text'] = inline
+    elif chunk.get('chunk_text_path'):
         chunk_text = download_chunk_text(chunk['chunk_text_path'])
         chunk['chunk_text'] = chunk_text if chunk_text else None
     else:
@@ -48,17 +306,24 @@ def load_chunk_text(chunk: Dict[str, Any]) -> Dict[str, Any]:
 
 def load_chunks_text(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Load chunk text from storage for multiple chunks
+    Load chunk text for multiple chunks
+    Inline texts are used as-is; storage downloads run concurrently.
     Modifies chunks in-place and returns them
     
     Args:
-        chunks: List of chunk dictionaries with chunk_text_path
+        chunks: List of chunk dictionaries with chunk_text_inline and/or chunk_text_path
         
     Returns:
-        List of chunk dictionaries with chunk_text added
+        List of chunk dictionaries with chunk_text added (chunk_text_inline removed)
     """
     for chunk in chunks:
-        load_chunk_text(chunk)
+        chunk['chunk_text'] = chunk.pop('chunk_text_inline', None)
+    
+    with_path = [chunk for chunk in chunks if chunk['chunk_text'] is None and chunk.get('chunk_text_path')]
+    texts = download_chunk_texts([chunk['chunk_text_path'] for chunk in with_path])
+    
+    for chunk, chunk_text in zip(with_path, texts):
+        chunk['chunk_text'] = chunk_text if chunk_text else None
     return chunks
 
 
@@ -73,7 +338,7 @@ def create_chunk(
 ) -> Optional[Dict[str, Any]]:
     """
     Create a new subtitle chunk with optional AI fields
-    Stores chunk text in storage, metadata in DB
+    Stores chunk text in storage (or inline in the row when short), metadata in DB
     
     Args:
         video_id: YouTube video ID
@@ -88,37 +353,78 @@ def create_chunk(
         Created chunk record or None on error
     """
     try:
-        # Upload chunk text to storage
-        chunk_text_path = upload_chunk_text(video_id, chunk_id, chunk_text)
-        if not chunk_text_path:
-            print(f"[DB!!] Failed to upload chunk text to storage")
-            return None
+        if is_inline_text(chunk_text):
+            chunk_text_path, chunk_text_inline = None, chunk_text
+        else:
+            # Upload chunk text to storage
+            chunk_text_path, chunk_text_inline = upload_chunk_text(video_id, chunk_id, chunk_text), None
+            if not chunk_text_path:
+                log.warning("[DB!!] Failed to upload chunk text to storage")
+                return None
         
         chunk_data = {
             'video_id': video_id,
             'chunk_id': chunk_id,
             'chunk_text_path': chunk_text_path,
+            'chunk_text_inline': chunk_text_inline,
             'short_title': short_title,
             'ai_field_1': ai_field_1,
             'ai_field_2': ai_field_2,
             'ai_field_3': ai_field_3
         }
         
-        print(f"[DB->] UPSERT subtitle_chunks (video={video_id}, chunk={chunk_id}, storage={chunk_text_path})")
-        response = supabase.table("subtitle_chunks").upsert(chunk_data).execute()
+        # Queue for a coalesced upsert with any concurrent create_chunk calls
+        log.debug("[DB->] UPSERT subtitle_chunks (video=%s, chunk=%s, storage=%s)", video_id, chunk_id, chunk_text_path)
+        # (the loader refreshes the chunk index once per flushed batch)
+        row = _chunk_upsert_loader.load(chunk_data)
+        invalidate_video(video_id)
         
-        if response.data and len(response.data) > 0:
-            print(f"[DB<-] Upserted chunk {chunk_id} for video {video_id}")
-            return response.data[0]
+        if row:
+            log.debug("[DB<-] Upserted chunk %s for video %s", chunk_id, video_id)
+            return row
         else:
-            print(f"[DB!!] Failed to create chunk {chunk_id}")
+            log.warning("[DB!!] Failed to create chunk %s", chunk_id)
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
+def _update_ai_fields_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    UPDATE AI fields from partial rows; never inserts
+    
+    Uses the update_chunk_ai_fields RPC (one UPDATE over a JSON array, see
+    .db apply/update_chunk_ai_fields_rpc.sql); falls back to one PostgREST
+    UPDATE per row when the function isn't installed. Raises on other errors.
+    
+    Args:
+        rows: Partial rows {video_id, chunk_id, <AI fields>}
+        
+    Returns:
+        Updated chunk records (rows for missing chunks are absent)
+    """
+    try:
+        log.debug("[DB->] RPC update_chunk_ai_fields(count=%s)", len(rows))
+        response = execute_with_retry(_sb().rpc("update_chunk_ai_fields", {"p_rows": rows}))
+        return response.data or []
+    except APIError as e:
+        # PGRST202: function not found - migration not applied yet
+        if e.code != "PGRST202":
+            raise
+    
+    updated = []
+    for row in rows:
+        fields = {key: value for key, value in row.items() if key in CHUNK_AI_FIELDS}
+        log.debug("[DB->] UPDATE subtitle_chunks AI fields (video=%s, chunk=%s)", row['video_id'], row['chunk_id'])
+        response = execute_with_retry(
+            _chunks().update(fields).eq("video_id", row['video_id']).eq("chunk_id", row['chunk_id'])
+        )
+        updated.extend(response.data or [])
+    return updated
+
+
 def update_chunk_ai_fields(
     video_id: str,
     chunk_id: int,
@@ -154,23 +460,63 @@ def update_chunk_ai_fields(
             update_data['ai_field_3'] = ai_field_3
         
         if not update_data:
-            print("[DB!!] No AI fields to update")
+            log.warning("[DB!!] No AI fields to update")
             return None
         
-        print(f"[DB->] UPDATE subtitle_chunks (video={video_id}, chunk={chunk_id}, fields={len(update_data)})")
-        response = supabase.table("subtitle_chunks").update(
-            update_data
-        ).eq("video_id", video_id).eq("chunk_id", chunk_id).execute()
+        # Queued as a partial-row update, coalesced with concurrent updates
+        log.debug("[DB->] UPDATE subtitle_chunks AI fields (video=%s, chunk=%s, fields=%s)", video_id, chunk_id, len(update_data))
+        # (the loader refreshes the chunk index once per flushed batch)
+        row = _ai_fields_loader.load({'video_id': video_id, 'chunk_id': chunk_id, **update_data})
+        invalidate_video(video_id)
         
-        if response.data and len(response.data) > 0:
-            print(f"[DB<-] Updated AI fields for chunk {chunk_id}")
-            return response.data[0]
+        if row:
+            log.debug("[DB<-] Updated AI fields for chunk %s", chunk_id)
+            return row
+        else:
+            log.warning("[DB!!] No chunk found: %s/%s", video_id, chunk_id)
+            return None
+            
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return None
+
+
+def bulk_set_ai_fields(updates: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Write AI fields for many chunks in a single UPDATE request
+    
+    Args:
+        updates: Partial rows {video_id, chunk_id, short_title?, ai_field_1?, ai_field_2?, ai_field_3?}
+                 for existing chunks. Fields left out of a row are never overwritten,
+                 and rows for chunks that don't exist are skipped.
+        
+    Returns:
+        List of updated chunks or None on error
+    """
+    try:
+        if not updates:
+            log.warning("[DB!!] No AI fields to update")
+            return None
+        
+        # Last write wins for repeated chunks
+        rows = {(update['video_id'], update['chunk_id']): update for update in updates}
+        
+        log.debug("[DB->] BULK UPDATE subtitle_chunks AI fields (count=%s)", len(rows))
+        updated_chunks = _update_ai_fields_rows(list(rows.values()))
+        
+        for video_id in {update['video_id'] for update in updates}:
+            invalidate_video(video_id)
+            refresh_chunk_index(video_id)
+        
+        if updated_chunks:
+            log.debug("[DB<-] Updated %s chunks with AI fields", len(updated_chunks))
+            return updated_chunks
         else:
-            print(f"[DB!!] No chunk found: {video_id}/{chunk_id}")
+            log.warning("[DB!!] Failed to update chunks")
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
@@ -193,20 +539,21 @@ def update_chunk_note(
     try:
         update_data = {'note_content': note_content}
         
-        print(f"[DB->] UPDATE subtitle_chunks note_content (video={video_id}, chunk={chunk_id}, len={len(note_content)})")
-        response = supabase.table("subtitle_chunks").update(
+        log.debug("[DB->] UPDATE subtitle_chunks note_content (video=%s, chunk=%s, len=%s)", video_id, chunk_id, len(note_content))
+        response = execute_with_retry(_chunks().update(
             update_data
-        ).eq("video_id", video_id).eq("chunk_id", chunk_id).execute()
+        ).eq("video_id", video_id).eq("chunk_id", chunk_id))
+        invalidate_video(video_id)
         
         if response.data and len(response.data) > 0:
-            print(f"[DB<-] Updated note for chunk {chunk_id}")
+            log.debug("[DB<-] Updated note for chunk %s", chunk_id)
             return response.data[0]
         else:
-            print(f"[DB!!] No chunk found: {video_id}/{chunk_id}")
+            log.warning("[DB!!] No chunk found: %s/%s", video_id, chunk_id)
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
@@ -216,7 +563,7 @@ def update_chunk_text(
     chunk_text: str
 ) -> Optional[Dict[str, Any]]:
     """
-    Update chunk text content in storage
+    Update chunk text content (inline in the row when short, otherwise in storage)
     
     Args:
         video_id: YouTube video ID
@@ -227,60 +574,235 @@ def update_chunk_text(
         Updated chunk record or None on error
     """
     try:
-        # Get current chunk to get the text path
-        print(f"[DB->] SELECT subtitle_chunks WHERE video_id={video_id}, chunk_id={chunk_id}")
-        response = supabase.table("subtitle_chunks").select(
-            "chunk_text_path"
-        ).eq("video_id", video_id).eq("chunk_id", chunk_id).execute()
-        
-        if not response.data or len(response.data) == 0:
-            print(f"[DB!!] No chunk found: {video_id}/{chunk_id}")
-            return None
+        # Paths are deterministic, so no SELECT is needed to find the current file
+        stored_path = chunk_text_path_for(video_id, chunk_id)
+        legacy_path = f"{video_id}/chunk_{chunk_id}.txt"
         
-        # Upload new chunk text to storage (this will overwrite the existing file)
-        chunk_text_path = upload_chunk_text(video_id, chunk_id, chunk_text)
-        if not chunk_text_path:
-            print(f"[DB!!] Failed to upload updated chunk text to storage")
-            return None
-        
-        print(f"[DB->] Updated chunk text in storage for chunk {chunk_id}")
+        if is_inline_text(chunk_text):
+            log.debug("[DB->] UPDATE subtitle_chunks chunk_text_inline (video=%s, chunk=%s)", video_id, chunk_id)
+            response = execute_with_retry(_chunks().update(
+                {'chunk_text_inline': chunk_text, 'chunk_text_path': None}
+            ).eq("video_id", video_id).eq("chunk_id", chunk_id))
+            if not response.data:
+                log.warning("[DB!!] No chunk found: %s/%s", video_id, chunk_id)
+                return None
+            invalidate_video(video_id)
+            
+            # Whatever the row pointed at before is now unreferenced
+            delete_chunk_files_from_storage([stored_path, legacy_path])
+            chunk_text_path = None
+        else:
+            # Upload first (overwrites the existing object), then point the row at it;
+            # only inline rows and rows written before gzip storage need the UPDATE,
+            # otherwise a HEAD count confirms the row exists
+            chunk_text_path = upload_chunk_text(video_id, chunk_id, chunk_text)
+            if not chunk_text_path:
+                log.warning("[DB!!] Failed to upload updated chunk text to storage")
+                return None
+            
+            log.debug("[DB->] UPDATE subtitle_chunks chunk_text_path (video=%s, chunk=%s)", video_id, chunk_id)
+            repointed = execute_with_retry(_chunks().update(
+                {'chunk_text_path': chunk_text_path, 'chunk_text_inline': None}
+            ).eq("video_id", video_id).eq("chunk_id", chunk_id).or_(
+                f'chunk_text_path.is.null,chunk_text_path.neq."{chunk_text_path}"'
+)).data
+            if repointed:
+                delete_chunk_from_storage(legacy_path)
+            else:
+                log.debug("[DB->] HEAD subtitle_chunks count (video=%s, chunk=%s)", video_id, chunk_id)
+                exists = _chunks().select(
+                    "chunk_id", count="exact", head=True
+                ).eq("video_id", video_id).eq("chunk_id", chunk_id).execute().count
+                if not exists:
+                    # Don't leave the upload behind for a chunk that doesn't exist
+                    delete_chunk_from_storage(chunk_text_path)
+                    log.warning("[DB!!] No chunk found: %s/%s", video_id, chunk_id)
+                    return None
+            invalidate_video(video_id)
         
-        # Return the updated chunk with text loaded
-        chunk = response.data[0]
-        chunk['chunk_text'] = chunk_text
-        return chunk
+        log.debug("[DB->] Updated chunk text for chunk %s", chunk_id)
+        return {
+            'video_id': video_id,
+            'chunk_id': chunk_id,
+            'chunk_text_path': chunk_text_path,
+            'chunk_text': chunk_text
+        }
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
-def get_chunks_by_video(video_id: str) -> List[Dict[str, Any]]:
+def get_chunks_by_video(video_id: str, columns: str = CHUNK_COLUMNS) -> List[Dict[str, Any]]:
     """
     Get all chunks for a video
     Note: chunk_text is loaded from storage on demand
     
     Args:
         video_id: YouTube video ID
+        columns: Columns to select (default: every stored column). Pass a narrower
+                 list, e.g. CHUNK_STATUS_COLUMNS, when notes/paths aren't needed.
         
     Returns:
         List of chunk records ordered by chunk_id (includes chunk_text_path, not chunk_text)
     """
+    cached, stale = _chunk_reads.get_stale(("get_chunks_by_video", video_id, columns))
+    if cached is not MISSING:
+        # Stale-while-revalidate: answer from cache, refresh off the request path
+        if stale:
+            _refresh_chunks_in_background(video_id, columns)
+        # Copies, since callers (e.g. load_chunks_text) modify chunks in-place
+        return [dict(chunk) for chunk in cached]
+    
     try:
-        print(f"[DB->] SELECT subtitle_chunks WHERE video_id={video_id}")
-        response = supabase.table("subtitle_chunks").select(
-            "*"
+        return _load_chunks_by_video(video_id, columns)
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return []
+
+
+def _load_chunks_by_video(video_id: str, columns: str = CHUNK_COLUMNS) -> List[Dict[str, Any]]:
+    """Query a video's chunks and (re)populate the get_chunks_by_video cache entry"""
+    generation = _video_generation(video_id)
+    log.debug("[DB->] SELECT subtitle_chunks WHERE video_id=%s", video_id)
+    response = _chunks().select(
+        columns
+    ).eq("video_id", video_id).order("chunk_id").execute()
+    
+    result = response.data if response.data else []
+    log.debug("[DB<-] Found %s chunks", len(result))
+    _cache_if_current(
+        _chunk_reads, ("get_chunks_by_video", video_id, columns), video_id, generation,
+        [dict(chunk) for chunk in result]
+    )
+    return result
+
+
+def _refresh_chunks_in_background(video_id: str, columns: str = CHUNK_COLUMNS) -> None:
+    """Reload a stale get_chunks_by_video entry on a daemon thread (one refresh per entry)"""
+    refresh_key = (video_id, columns)
+    with _refreshing_lock:
+        if refresh_key in _refreshing:
+            return
+        _refreshing.add(refresh_key)
+    
+    def refresh():
+        try:
+            _load_chunks_by_video(video_id, columns)
+        except Exception as e:
+            log.error("[DB!!] %s", e)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(refresh_key)
+    
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_chunks_metadata(video_id: str) -> List[Dict[str, Any]]:
+    """
+    Get slim chunk rows for a video (no AI fields or notes)
+    Use when only ids/storage paths are needed, e.g. existence checks
+    or before load_chunks_text
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        List of {video_id, chunk_id, chunk_text_path, chunk_text_inline, short_title} ordered by chunk_id
+    """
+    cache_key = ("get_chunks_metadata", video_id)
+    cached = _chunk_reads.get(cache_key)
+    if cached is not MISSING:
+        return [dict(chunk) for chunk in cached]
+    
+    generation = _video_generation(video_id)
+    try:
+        log.debug("[DB->] SELECT chunk metadata WHERE video_id=%s", video_id)
+        response = _chunks().select(
+            CHUNK_METADATA_COLUMNS
         ).eq("video_id", video_id).order("chunk_id").execute()
         
         result = response.data if response.data else []
-        print(f"[DB<-] Found {len(result)} chunks")
+        log.debug("[DB<-] Found %s chunks", len(result))
+        _cache_if_current(_chunk_reads, cache_key, video_id, generation, [dict(chunk) for chunk in result])
         return result
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return []
 
 
+def count_chunks(video_id: str) -> int:
+    """
+    Count a video's chunks without fetching them
+    (HEAD request with count=exact - the total comes back in Content-Range)
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Number of chunks (0 on error)
+    """
+    try:
+        log.debug("[DB->] HEAD subtitle_chunks count WHERE video_id=%s", video_id)
+        response = _chunks().select(
+            "chunk_id", count="exact", head=True
+        ).eq("video_id", video_id).execute()
+        
+        count = response.count or 0
+        log.debug("[DB<-] Counted %s chunks", count)
+        return count
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return 0
+
+
+def get_videos_with_chunk_counts(limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Most recently updated videos with their chunk counts, in one query
+    (embedded subtitle_chunks(count) - no per-video count requests)
+    
+    Args:
+        limit: Maximum number of videos to return
+        
+    Returns:
+        List of {id, title, chunk_count} records (empty on error)
+    """
+    try:
+        log.debug("[DB->] SELECT youtube_videos + subtitle_chunks(count) (limit=%s)", limit)
+        response = _sb().table("youtube_videos").select(
+            "id, title, subtitle_chunks(count)"
+        ).order("updated_at", desc=True).limit(limit).execute()
+        
+        videos = []
+        for row in response.data or []:
+            counts = row.pop('subtitle_chunks', None) or [{}]
+            row['chunk_count'] = counts[0].get('count', 0)
+            videos.append(row)
+        
+        log.debug("[DB<-] Counted chunks for %s videos", len(videos))
+        return videos
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return []
+
+
+def has_chunks(video_id: str) -> bool:
+    """
+    Check whether a video has any chunks (no rows transferred)
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        True if at least one chunk exists
+    """
+    return count_chunks(video_id) > 0
+
+
 def get_chunk_metadata(video_id: str, chunk_id: int) -> Optional[Dict[str, Any]]:
     """
     Get chunk metadata only (no text loading from storage)
@@ -294,65 +816,135 @@ def get_chunk_metadata(video_id: str, chunk_id: int) -> Optional[Dict[str, Any]]
         Chunk metadata without chunk_text
     """
     try:
-        print(f"[DB->] SELECT chunk metadata WHERE video_id={video_id} AND chunk_id={chunk_id}")
-        response = supabase.table("subtitle_chunks").select("*").eq("video_id", video_id).eq("chunk_id", chunk_id).execute()
+        log.debug("[DB->] SELECT chunk metadata WHERE video_id=%s AND chunk_id=%s", video_id, chunk_id)
+        response = _chunks().select("*").eq("video_id", video_id).eq("chunk_id", chunk_id).execute()
         
         if response.data and len(response.data) > 0:
-            print(f"[DB<-] Found chunk {chunk_id} metadata")
+            log.debug("[DB<-] Found chunk %s metadata", chunk_id)
             return response.data[0]
         else:
-            print(f"[DB<-] Chunk not found")
+            log.debug("[DB<-] Chunk not found")
             return None
 
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
-def get_chunk_details(video_id: str, chunk_id: int, include_text: bool = True) -> Optional[Dict[str, Any]]:
+def get_chunk_metadata_batch(video_id: str, chunk_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Get metadata for several chunks of a video in one query
+    Use instead of calling get_chunk_metadata in a loop
+    
+    Args:
+        video_id: YouTube video ID
+        chunk_ids: Chunk identifiers to look up
+        
+    Returns:
+        Dict of chunk_id -> chunk metadata (missing chunks are absent; empty on error)
+    """
+    if not chunk_ids:
+        return {}
+    
+    try:
+        log.debug("[DB->] SELECT chunk metadata WHERE video_id=%s AND chunk_id IN (%s ids)", video_id, len(chunk_ids))
+        response = _chunks().select("*").eq("video_id", video_id).in_(
+            "chunk_id", list(set(chunk_ids))
+        ).execute()
+        
+        result = {chunk['chunk_id']: chunk for chunk in response.data or []}
+        log.debug("[DB<-] Found %s/%s chunks", len(result), len(chunk_ids))
+        return result
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return {}
+
+
+def get_chunk_details(
+    video_id: str,
+    chunk_id: int,
+    include_text: bool = True,
+    prefetch: bool = True
+) -> Optional[Dict[str, Any]]:
     """
     Get detailed information for a specific chunk
     
     Args:
         video_id: YouTube video ID
         chunk_id: Chunk identifier
-        include_text: If True, fetch chunk_text from storage
+        include_text: If True, add chunk_text (inline column, else storage)
+        prefetch: If True (and include_text), warm the text cache with the video's
+                  other chunks in the background - readers usually page through them.
+                  Pass False from batch jobs that touch one chunk per video.
         
     Returns:
         Chunk record or None if not found
     """
     try:
-        print(f"[DB->] SELECT chunk_details WHERE video_id={video_id}, chunk_id={chunk_id}")
-        response = supabase.table("subtitle_chunks").select(
-            "*"
-        ).eq("video_id", video_id).eq("chunk_id", chunk_id).execute()
+        cache_key = ("get_chunk_details", video_id, chunk_id)
+        cached = _chunk_reads.get(cache_key)
         
-        if response.data and len(response.data) > 0:
-            chunk = response.data[0]
+        if cached is not MISSING:
+            chunk = dict(cached)
+        else:
+            generation = _video_generation(video_id)
+            # Single-row lookup via a SQL function (see .db apply/get_chunk_rpc.sql)
+            log.debug("[DB->] RPC get_chunk(vid=%s, cid=%s)", video_id, chunk_id)
+            response = _sb().rpc(
+                "get_chunk",
+                {"vid": video_id, "cid": chunk_id}
+            ).execute()
             
+            chunk = response.data[0] if response.data else None
+            if chunk:
+                _cache_if_current(_chunk_reads, cache_key, video_id, generation, dict(chunk))
+        
+        if chunk:
+            inline = chunk.pop('chunk_text_inline', None)
+            if include_text and inline is not None:
+                chunk['chunk_text'] = inline
             # Load chunk text from storage if requested
-            if include_text and chunk.get('chunk_text_path'):
+            elif include_text and chunk.get('chunk_text_path'):
                 chunk_text = download_chunk_text(chunk['chunk_text_path'])
                 if chunk_text:
                     chunk['chunk_text'] = chunk_text
                 else:
-                    print(f"[DB!!] Failed to load chunk text from storage")
+                    log.warning("[DB!!] Failed to load chunk text from storage")
                     chunk['chunk_text'] = None
             
-            print(f"[DB<-] Found chunk {chunk_id}")
+            if include_text and prefetch:
+                _prefetch_video_texts(video_id)
+            
+            log.debug("[DB<-] Found chunk %s", chunk_id)
             return chunk
-        print(f"[DB<-] Chunk not found")
+        log.debug("[DB<-] Chunk not found")
         return None
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
+def _prefetch_video_texts(video_id: str) -> None:
+    """Download all of a video's chunk texts into the storage text cache on a daemon thread"""
+    if _prefetched_videos.get(video_id) is not MISSING:
+        return
+    _prefetched_videos.set(video_id, True)
+    
+    def prefetch():
+        chunks = get_chunks_metadata(video_id)
+        download_chunk_texts([chunk['chunk_text_path'] for chunk in chunks if chunk.get('chunk_text_path')])
+        log.debug("[DB<-] Prefetched %s chunk texts for video %s", len(chunks), video_id)
+    
+    threading.Thread(target=prefetch, daemon=True).start()
+
+
 def get_chunk_index(video_id: str) -> List[Dict[str, Any]]:
     """
     Get chunk index (chunk_id, short_title) for a video
-    Used for dropdown display
+    Used for dropdown display; reads the chunk_index_cache table
+    (see .db apply/chunk_index_cache.sql), or subtitle_chunks if it doesn't exist
     
     Args:
         video_id: YouTube video ID
@@ -360,18 +952,33 @@ def get_chunk_index(video_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of {chunk_id, short_title} records
     """
+    cache_key = ("get_chunk_index", video_id)
+    cached = _chunk_index_reads.get(cache_key)
+    if cached is not MISSING:
+        return [dict(entry) for entry in cached]
+    
+    generation = _video_generation(video_id)
     try:
-        print(f"[DB->] SELECT chunk_index WHERE video_id={video_id}")
-        response = supabase.table("subtitle_chunks").select(
-            "chunk_id, short_title"
-        ).eq("video_id", video_id).order("chunk_id").execute()
+        log.debug("[DB->] SELECT chunk_index WHERE video_id=%s", video_id)
+        try:
+            response = _sb().table("chunk_index_cache").select(
+                "chunk_id, short_title"
+            ).eq("video_id", video_id).order("chunk_id").execute()
+        except APIError as e:
+            # PGRST205 / 42P01: cache table not created yet - migration not applied
+            if e.code not in ("PGRST205", "42P01"):
+                raise
+            response = _chunks().select(
+                "chunk_id, short_title"
+            ).eq("video_id", video_id).order("chunk_id").execute()
         
         result = response.data if response.data else []
-        print(f"[DB<-] Found {len(result)} index entries")
+        log.debug("[DB<-] Found %s index entries", len(result))
+        _cache_if_current(_chunk_index_reads, cache_key, video_id, generation, [dict(entry) for entry in result])
         return result
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return []
 
 
@@ -386,128 +993,241 @@ def delete_chunks_by_video(video_id: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        # Delete from storage first
-        delete_video_chunks_from_storage(video_id)
+        # Delete the rows and get their storage paths back in one round-trip
+        # (see .db apply/delete_video_chunks_rpc.sql), then remove exactly those files
+        log.debug("[DB->] RPC delete_video_chunks(p_video_id=%s)", video_id)
+        try:
+            response = execute_with_retry(_sb().rpc(
+                "delete_video_chunks",
+                {"p_video_id": video_id}
+            ))
+            chunk_text_paths = response.data or []
+        except APIError as e:
+            # PGRST202: function not found - migration not applied yet
+            if e.code != "PGRST202":
+                raise
+            chunk_text_paths = None
         
-        # Then delete from database
-        print(f"[DB->] DELETE subtitle_chunks WHERE video_id={video_id}")
-        response = supabase.table("subtitle_chunks").delete().eq(
-            "video_id", video_id
-        ).execute()
+        if chunk_text_paths is None:
+            delete_video_chunks_from_storage(video_id)
+            execute_with_retry(_chunks().delete(returning="minimal").eq(
+                "video_id", video_id
+            ))
+        elif chunk_text_paths:
+            delete_chunk_files_from_storage(chunk_text_paths)
+        invalidate_video(video_id)
+        refresh_chunk_index(video_id)
         
-        print(f"[DB<-] Deleted chunks for video: {video_id}")
+        log.debug("[DB<-] Deleted chunks for video: %s", video_id)
         return True
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return False
 
 
-def bulk_create_chunks(chunks: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+def _write_chunk_rows(
+    db_chunks: List[Dict[str, Any]],
+    returning: str,
+    ingest: bool
+) -> List[Dict[str, Any]]:
     """
-    Create multiple chunks in a single request
-    Uploads all chunk texts to storage, then creates DB records
+    Write one batch of bulk_create_chunks rows; returns the rows written (raises on error)
+    Every row in the batch must set the same AI fields
+    """
+    if len(db_chunks) > INGEST_RPC_THRESHOLD:
+        log.debug("[DB->] RPC ingest_chunks (count=%s)", len(db_chunks))
+        execute_with_retry(_sb().rpc(
+            "ingest_chunks",
+            {
+                "payload": db_chunks,
+                "skip_existing": ingest,
+                # AI fields not listed keep their stored value on conflict
+                "update_columns": [field for field in CHUNK_AI_FIELDS if field in db_chunks[0]]
+            }
+        ))
+        return db_chunks
+    
+    log.debug("[DB->] BULK UPSERT subtitle_chunks (count=%s)", len(db_chunks))
+    response = execute_with_retry(_chunks().upsert(
+        db_chunks,
+        on_conflict="video_id,chunk_id",
+        ignore_duplicates=ingest,
+        returning=returning
+    ))
+    # Errors raise, so an empty body under return=minimal means success
+    return (response.data or []) if returning == "representation" else db_chunks
+
+
+def bulk_create_chunks(
+    chunks: List[Dict[str, Any]],
+    returning: str = "minimal",
+    ingest: bool = False
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Create multiple chunks with as few DB requests as possible
+    Chunk texts upload concurrently. Up to INGEST_RPC_THRESHOLD chunks, rows for
+    finished uploads are written in batches of BULK_FLUSH_SIZE while the remaining
+    uploads are still in flight; larger inputs are written after all uploads
+    finish, through the ingest_chunks RPC. Short texts skip storage and go inline
+    in the row.
+    
+    Not atomic: batches written before an error stay committed even though
+    None is returned. Callers re-run the ingest to finish it (rows are keyed
+    on (video_id, chunk_id), so a re-run is safe).
     
     Args:
         chunks: List of chunk dictionaries with required fields:
                 video_id, chunk_id, chunk_text
+                and optional short_title, ai_field_1, ai_field_2, ai_field_3
+        returning: "minimal" (default) skips echoing the rows back from PostgREST;
+                   pass "representation" to get the stored rows (updated_at etc.)
+        ingest: Pure ingest mode - rows that already exist for (video_id, chunk_id)
+                are left as-is instead of being rewritten (ignore_duplicates).
+                Keep False for paths that must overwrite AI fields.
         
     Returns:
-        List of created chunks or None on error
+        List of created chunks (in input order) or None on error
+        (with returning="minimal" or the ingest_chunks RPC, the rows that were written)
     """
     try:
-        # First, upload all chunk texts to storage
-        db_chunks = []
-        for chunk in chunks:
-            video_id = chunk['video_id']
-            chunk_id = chunk['chunk_id']
-            chunk_text = chunk['chunk_text']
+        inline_chunks = [chunk for chunk in chunks if is_inline_text(chunk['chunk_text'])]
+        uploads = {
+            submit_chunk_text_upload(chunk['video_id'], chunk['chunk_id'], chunk['chunk_text']): chunk
+            for chunk in chunks
+            if not is_inline_text(chunk['chunk_text'])
+        }
+        
+        # Large inputs are written once every upload is done, so each batch is big
+        # enough for the ingest_chunks RPC (see _write_chunk_rows)
+        stream = len(chunks) <= INGEST_RPC_THRESHOLD
+        
+        result = []
+        # Pending rows grouped by the AI fields they set: PostgREST sends the union
+        # of a batch's keys, so a row missing a field would have it written as NULL
+        batches: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        remaining = len(inline_chunks) + len(uploads)
+        # Inline rows are ready immediately; uploaded ones as their uploads finish
+        for future, chunk in itertools.chain(
+            ((None, chunk) for chunk in inline_chunks),
+            ((future, uploads[future]) for future in as_completed(uploads))
+        ):
+            remaining -= 1
+            if future is None:
+                chunk_text_path, chunk_text_inline = None, chunk['chunk_text']
+            else:
+                chunk_text_path, chunk_text_inline = future.result(), None
             
-            chunk_text_path = upload_chunk_text(video_id, chunk_id, chunk_text)
-            if not chunk_text_path:
-                print(f"[DB!!] Failed to upload chunk {chunk_id} to storage")
-                continue
+            shape = tuple(field for field in CHUNK_AI_FIELDS if field in chunk)
+            if not chunk_text_path and chunk_text_inline is None:
+                log.warning("[DB!!] Failed to upload chunk %s to storage", chunk['chunk_id'])
+            else:
+                # Prepare DB record with storage path (or inline text) instead of text
+                # AI fields are only sent when the caller provides them (the columns
+                # default to NULL); pass a field explicitly to blank it on re-ingest
+                db_chunk = {
+                    'video_id': chunk['video_id'],
+                    'chunk_id': chunk['chunk_id'],
+                    'chunk_text_path': chunk_text_path,
+                    'chunk_text_inline': chunk_text_inline
+                }
+                for field in shape:
+                    db_chunk[field] = chunk[field]
+                batches.setdefault(shape, []).append(db_chunk)
             
-            # Prepare DB record with storage path instead of text
-            db_chunk = {
-                'video_id': video_id,
-                'chunk_id': chunk_id,
-                'chunk_text_path': chunk_text_path,
-                'short_title': chunk.get('short_title'),
-                'ai_field_1': chunk.get('ai_field_1'),
-                'ai_field_2': chunk.get('ai_field_2'),
-                'ai_field_3': chunk.get('ai_field_3')
-            }
-            db_chunks.append(db_chunk)
-        
-        if not db_chunks:
-            print(f"[DB!!] No chunks to upload")
-            return None
+            # Flush mid-stream so the DB write overlaps the uploads still running;
+            # whatever is left at the end goes out per shape
+            if stream and len(batches.get(shape, [])) >= BULK_FLUSH_SIZE and remaining:
+                result.extend(_write_chunk_rows(batches.pop(shape), returning, ingest))
         
-        # Bulk insert to database
-        print(f"[DB->] BULK UPSERT subtitle_chunks (count={len(db_chunks)})")
-        response = supabase.table("subtitle_chunks").upsert(db_chunks).execute()
+        for batch in batches.values():
+            result.extend(_write_chunk_rows(batch, returning, ingest))
         
-        if response.data:
-            print(f"[DB<-] Upserted {len(response.data)} chunks")
-            return response.data
+        if result:
+            order = {(chunk['video_id'], chunk['chunk_id']): i for i, chunk in enumerate(chunks)}
+            result.sort(key=lambda row: order.get((row['video_id'], row['chunk_id']), len(order)))
+            log.debug("[DB<-] Upserted %s chunks", len(result))
+            return result
         else:
-            print(f"[DB!!] Failed to create chunks")
+            log.warning("[DB!!] Failed to create chunks")
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
+    finally:
+        # Also after a failure - earlier batches may already be committed
+        for video_id in {chunk['video_id'] for chunk in chunks}:
+            invalidate_video(video_id)
+            refresh_chunk_index(video_id)
 
 
 def bulk_update_ai_fields(video_id: str, enriched_chunks: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
     """
-    Update AI fields for multiple chunks using targeted UPDATE statements
+    Update AI fields for multiple chunks of a video in one round-trip
     
-    NOTE: Uses a loop instead of bulk upsert because:
-    - Chunk text is 5-10x larger than AI fields
-    - UPDATE only sends small AI fields (~400 chars/chunk)
-    - UPSERT would require fetching + re-uploading chunk_text (~1400 chars/chunk)
-    - Loop with small updates is more efficient than bulk with large data
+    Uses the update_ai_fields_batch RPC (one planned UPDATE over a JSON array,
+    see .db apply/update_ai_fields_batch_rpc.sql); falls back to a single
+    partial-row update when the function isn't installed.
     
     Args:
         video_id: YouTube video ID
         enriched_chunks: List of dicts with chunk_id and AI fields (title, field_1, field_2, field_3)
         
     Returns:
-        List of updated chunks or None on error
+        List of the chunks that were updated ({video_id, chunk_id, AI fields});
+        chunks that don't exist are left out. None on error or if nothing was updated
     """
+    rows = [
+        {
+            'video_id': video_id,
+            'chunk_id': chunk['chunk_id'],
+            'short_title': chunk.get('title', ''),
+            'ai_field_1': chunk.get('field_1', ''),
+            'ai_field_2': chunk.get('field_2', ''),
+            'ai_field_3': chunk.get('field_3', '')
+        }
+        for chunk in enriched_chunks
+    ]
+    
     try:
-        print(f"[DB->] Updating AI fields for {len(enriched_chunks)} chunks (targeted updates)")
-        
-        updated_chunks = []
-        for chunk in enriched_chunks:
-            # Update only AI fields - no need to send chunk_text
-            update_data = {
-                'short_title': chunk.get('title', ''),
-                'ai_field_1': chunk.get('field_1', ''),
-                'ai_field_2': chunk.get('field_2', ''),
-                'ai_field_3': chunk.get('field_3', '')
+        log.debug("[DB->] RPC update_ai_fields_batch(p_video_id=%s, count=%s)", video_id, len(enriched_chunks))
+        response = execute_with_retry(_sb().rpc(
+            "update_ai_fields_batch",
+            {
+                "p_video_id": video_id,
+                "p_rows": [
+                    {
+                        'chunk_id': row['chunk_id'],
+                        'title': row['short_title'],
+                        'field_1': row['ai_field_1'],
+                        'field_2': row['ai_field_2'],
+                        'field_3': row['ai_field_3']
+                    }
+                    for row in rows
+                ]
             }
-            
-            response = supabase.table("subtitle_chunks").update(update_data).eq(
-                'video_id', video_id
-            ).eq(
-                'chunk_id', chunk['chunk_id']
-            ).execute()
-            
-            if response.data and len(response.data) > 0:
-                updated_chunks.extend(response.data)
+        ))
         
-        if updated_chunks:
-            print(f"[DB<-] Updated {len(updated_chunks)} chunks with AI fields")
-            return updated_chunks
-        else:
-            print(f"[DB!!] Failed to update chunks")
-            return None
-            
+        invalidate_video(video_id)
+        refresh_chunk_index(video_id)
+        
+        updated_ids = {row['chunk_id'] for row in response.data or []}
+        updated = [row for row in rows if row['chunk_id'] in updated_ids]
+        if updated:
+            log.debug("[DB<-] Updated %s chunks with AI fields", len(updated))
+            return updated
+        log.warning("[DB!!] Failed to update chunks")
+        return None
+        
+    except APIError as e:
+        # PGRST202: function not found - migration not applied yet
+        if e.code == "PGRST202":
+            return bulk_set_ai_fields(rows)
+        log.error("[DB!!] %s", e)
+        return None
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
@@ -518,33 +1238,31 @@ def get_unprocessed_chunks(video_id: str, include_text: bool = True) -> List[Dic
     
     Args:
         video_id: YouTube video ID
-        include_text: If True, fetch chunk_text from storage for each chunk
+        include_text: If True, add chunk_text for each chunk (inline or from storage)
         
     Returns:
-        List of unprocessed chunk records
+        List of unprocessed chunks ({video_id, chunk_id, chunk_text_path, chunk_text_inline}
+        without include_text, {video_id, chunk_id, chunk_text_path, chunk_text} with it)
     """
     try:
-        print(f"[DB->] SELECT subtitle_chunks WHERE video_id={video_id} AND AI fields NULL")
-        response = supabase.table("subtitle_chunks").select(
-            "*"
-        ).eq("video_id", video_id).or_(
-            "short_title.is.null,ai_field_1.is.null,ai_field_2.is.null,ai_field_3.is.null"
-        ).order("chunk_id").execute()
+        # is_unprocessed is a generated column backed by a partial index
+        # (see .db apply/unprocessed_chunks_index.sql)
+        log.debug("[DB->] SELECT subtitle_chunks WHERE video_id=%s AND is_unprocessed", video_id)
+        response = _chunks().select(
+            "video_id, chunk_id, chunk_text_path, chunk_text_inline"
+        ).eq("video_id", video_id).eq("is_unprocessed", True).order("chunk_id").execute()
         
         chunks = response.data if response.data else []
         
-        # Load chunk text from storage if requested
+        # Load chunk text from storage if requested (concurrent downloads)
         if include_text:
-            for chunk in chunks:
-                if chunk.get('chunk_text_path'):
-                    chunk_text = download_chunk_text(chunk['chunk_text_path'])
-                    chunk['chunk_text'] = chunk_text if chunk_text else None
+            load_chunks_text(chunks)
         
-        print(f"[DB<-] Found {len(chunks)} unprocessed chunks")
+        log.debug("[DB<-] Found %s unprocessed chunks", len(chunks))
         return chunks
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return []
 
 
@@ -558,12 +1276,49 @@ def is_chunk_processed(chunk: Dict[str, Any]) -> bool:
     Returns:
         True if all AI fields are populated, False otherwise
     """
-    return all([
-        chunk.get('short_title'),
-        chunk.get('ai_field_1'),
-        chunk.get('ai_field_2'),
-        chunk.get('ai_field_3')
-    ])
+    # Short-circuiting `and` chain - no per-call list allocation
+    get = chunk.get
+    return bool(
+        get('short_title') and get('ai_field_1') and get('ai_field_2') and get('ai_field_3')
+    )
+
+
+def count_processed_chunks(chunks: List[Dict[str, Any]]) -> int:
+    """
+    Count fully processed chunks in a batch (client-side counterpart of
+    the chunk_progress RPC, for chunk lists that are already in memory)
+    
+    Args:
+        chunks: List of chunk dictionaries
+        
+    Returns:
+        Number of chunks with all AI fields populated
+    """
+    return sum(1 for chunk in chunks if is_chunk_processed(chunk))
+
+
+def get_processed_count(video_id: str) -> int:
+    """
+    Count a video's fully AI-processed chunks server-side (HEAD, no rows)
+    Same rule as is_chunk_processed: neq('') rejects empty strings and,
+    since NULL <> '' is not true, NULLs as well
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Number of processed chunks
+    """
+    log.debug("[DB->] HEAD subtitle_chunks processed count WHERE video_id=%s", video_id)
+    query = _chunks().select("chunk_id", count="exact", head=True).eq("video_id", video_id)
+    for field in CHUNK_AI_FIELDS:
+        query = query.neq(field, "")
+    return query.execute().count or 0
+
+
+def _count_progress(video_id: str) -> Tuple[int, int]:
+    """(total, processed) from two HEAD count queries - fallback when the chunk_progress RPC isn't installed"""
+    return count_chunks(video_id), get_processed_count(video_id)
 
 
 def get_processing_progress(video_id: str) -> Dict[str, Any]:
@@ -577,9 +1332,174 @@ def get_processing_progress(video_id: str) -> Dict[str, Any]:
         Dictionary with total, processed, and unprocessed counts
     """
     try:
-        all_chunks = get_chunks_by_video(video_id)
-        total = len(all_chunks)
-        processed = sum(1 for chunk in all_chunks if is_chunk_processed(chunk))
+        # Counted server-side (see chunk_progress in .db apply/chunk_progress_rpc.sql)
+        log.debug("[DB->] RPC chunk_progress(vid=%s)", video_id)
+        try:
+            response = _sb().rpc("chunk_progress", {"vid": video_id}).execute()
+            counts = response.data[0] if response.data else {}
+            total = counts.get('total') or 0
+            processed = counts.get('processed') or 0
+        except APIError as e:
+            # PGRST202: function not found - migration not applied yet
+            if e.code != "PGRST202":
+                raise
+            total, processed = _count_progress(video_id)
+        log.debug("[DB<-] Progress: %s/%s chunks processed", processed, total)
+        
+        return {
+            'video_id': video_id,
+            'total_chunks': total,
+            'processed_chunks': processed,
+            'unprocessed_chunks': total - processed,
+            'progress_percent': (processed / total * 100) if total > 0 else 0
+        }
+        
+    except Exception as e:
+        log.error("Error getting processing progress: %s", e)
+        return {
+            'video_id': video_id,
+            'total_chunks': 0,
+            'processed_chunks': 0,
+            'unprocessed_chunks': 0,
+            'progress_percent': 0
+        }
+
+
+# ============================================================
+# ASYNC VARIANTS
+# ============================================================
+# Independent reads should run concurrently, never back to back:
+#
+#     chunks, index, progress = await asyncio.gather(
+#         aget_chunks_by_video(video_id),
+#         aget_chunk_index(video_id),
+#         aget_processing_progress(video_id),
+#     )
+#
+# Total latency is then the slowest query rather than the sum of all.
+# Use this style for any new endpoint that combines several reads.
+
+
+async def _get_async_client() -> AsyncClient:
+    """Get (or lazily create) the async Supabase client"""
+    return await get_async_service_client()
+
+
+async def aget_chunks_by_video(video_id: str) -> List[Dict[str, Any]]:
+    """
+    Async version of get_chunks_by_video (shares its cache)
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        List of chunk records ordered by chunk_id
+    """
+    cache_key = ("get_chunks_by_video", video_id, CHUNK_COLUMNS)
+    cached = _chunk_reads.get(cache_key)
+    if cached is not MISSING:
+        return [dict(chunk) for chunk in cached]
+    
+    generation = _video_generation(video_id)
+    try:
+        client = await _get_async_client()
+        log.debug("[DB->] SELECT subtitle_chunks WHERE video_id=%s (async)", video_id)
+        response = await client.table("subtitle_chunks").select(
+            CHUNK_COLUMNS
+        ).eq("video_id", video_id).order("chunk_id").execute()
+        
+        result = response.data if response.data else []
+        log.debug("[DB<-] Found %s chunks", len(result))
+        _cache_if_current(_chunk_reads, cache_key, video_id, generation, [dict(chunk) for chunk in result])
+        return result
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return []
+
+
+async def aget_chunk_index(video_id: str) -> List[Dict[str, Any]]:
+    """
+    Async version of get_chunk_index (shares its cache)
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        List of {chunk_id, short_title} records
+    """
+    cache_key = ("get_chunk_index", video_id)
+    cached = _chunk_index_reads.get(cache_key)
+    if cached is not MISSING:
+        return [dict(entry) for entry in cached]
+    
+    generation = _video_generation(video_id)
+    try:
+        client = await _get_async_client()
+        log.debug("[DB->] SELECT chunk_index WHERE video_id=%s (async)", video_id)
+        try:
+            response = await client.table("chunk_index_cache").select(
+                "chunk_id, short_title"
+            ).eq("video_id", video_id).order("chunk_id").execute()
+        except APIError as e:
+            # PGRST205 / 42P01: cache table not created yet - migration not applied
+            if e.code not in ("PGRST205", "42P01"):
+                raise
+            response = await client.table("subtitle_chunks").select(
+                "chunk_id, short_title"
+            ).eq("video_id", video_id).order("chunk_id").execute()
+        
+        result = response.data if response.data else []
+        log.debug("[DB<-] Found %s index entries", len(result))
+        _cache_if_current(_chunk_index_reads, cache_key, video_id, generation, [dict(entry) for entry in result])
+        return result
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return []
+
+
+async def _acount_progress(client: AsyncClient, video_id: str) -> Tuple[int, int]:
+    """Async _count_progress - both HEAD counts run concurrently on the async client"""
+    total_query = client.table("subtitle_chunks").select(
+        "chunk_id", count="exact", head=True
+    ).eq("video_id", video_id)
+    processed_query = client.table("subtitle_chunks").select(
+        "chunk_id", count="exact", head=True
+    ).eq("video_id", video_id)
+    for field in CHUNK_AI_FIELDS:
+        processed_query = processed_query.neq(field, "")
+    log.debug("[DB->] HEAD subtitle_chunks total/processed counts WHERE video_id=%s (async)", video_id)
+    total_response, processed_response = await asyncio.gather(
+        total_query.execute(), processed_query.execute()
+    )
+    return total_response.count or 0, processed_response.count or 0
+
+
+async def aget_processing_progress(video_id: str) -> Dict[str, Any]:
+    """
+    Async version of get_processing_progress
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Dictionary with total, processed, and unprocessed counts
+    """
+    try:
+        client = await _get_async_client()
+        log.debug("[DB->] RPC chunk_progress(vid=%s) (async)", video_id)
+        try:
+            response = await client.rpc("chunk_progress", {"vid": video_id}).execute()
+            counts = response.data[0] if response.data else {}
+            total = counts.get('total') or 0
+            processed = counts.get('processed') or 0
+        except APIError as e:
+            # PGRST202: function not found - migration not applied yet
+            if e.code != "PGRST202":
+                raise
+            total, processed = await _acount_progress(client, video_id)
+        log.debug("[DB<-] Progress: %s/%s chunks processed", processed, total)
         
         return {
             'video_id': video_id,
@@ -590,7 +1510,7 @@ def get_processing_progress(video_id: str) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        print(f"Error getting processing progress: {str(e)}")
+        log.error("Error getting processing progress: %s", e)
         return {
             'video_id': video_id,
             'total_chunks': 0,
@@ -598,3 +1518,26 @@ def get_processing_progress(video_id: str) -> Dict[str, Any]:
             'unprocessed_chunks': 0,
             'progress_percent': 0
         }
+
+
+async def aget_video_chunk_overview(video_id: str) -> Dict[str, Any]:
+    """
+    Get chunks, index and progress for a video with the reads run concurrently
+    
+    Args:
+        video_id: YouTube video ID
+        
+    Returns:
+        Dictionary with chunks, index and progress
+    """
+    chunks, index, progress = await asyncio.gather(
+        aget_chunks_by_video(video_id),
+        aget_chunk_index(video_id),
+        aget_processing_progress(video_id)
+    )
+    return {
+        'video_id': video_id,
+        'chunks': chunks,
+        'index': index,
+        'progress': progress
+    }
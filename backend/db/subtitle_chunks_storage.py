@@ -5,43 +5,88 @@ Uses service key for admin operations to bypass RLS
 """
 
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from typing import Optional
+import gzip
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional, List
+from .supabase_client import get_service_client
+from .ttl_cache import TTLCache, MISSING
 
-load_dotenv()
 
-# Initialize Supabase client with service key for storage admin operations
-url: str = os.getenv("SUPABASE_URL")
-# Try to use service key first, fallback to regular key
-service_key: str = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(url, service_key)
+def _storage():
+    """Storage API of the shared service-role client (same pool as the chunk CRUD)"""
+    return get_service_client().storage
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.subtitle_chunks_storage import supabase` working for scripts
+    if name == "supabase":
+        return get_service_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 BUCKET_NAME = "subtitle-chunks"
 
+# Shared pool for concurrent chunk uploads/downloads (storage calls are network-bound)
+# Storage requests go through the shared HTTP/2 client (supabase_client.http_client),
+# so these workers multiplex over a few TLS connections rather than one each
+MAX_TRANSFER_WORKERS = 16
+_transfer_pool = ThreadPoolExecutor(max_workers=MAX_TRANSFER_WORKERS, thread_name_prefix="chunk-transfer")
+
+# Decoded chunk texts keyed by storage path. Uploads write through and deletes
+# evict, so only writes from other processes can leave an entry stale (bounded by ttl)
+_text_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Chunk texts are stored gzip-compressed (~3x smaller for transcript text).
+# Sent as an application/gzip object rather than with Content-Encoding, since
+# the upload is a multipart form and the header would apply to the whole body.
+# upsert (x-upsert) overwrites an existing object in the same request
+GZIP_FILE_OPTIONS = {"content-type": "application/gzip", "upsert": "true"}
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Set once the bucket is known to exist, so the check runs once per process
+_bucket_ready = False
+
 
 def ensure_bucket_exists():
-    """Create the subtitle-chunks bucket if it doesn't exist"""
+    """
+    Create the subtitle-chunks bucket if it doesn't exist
+    Runs at most once per process; set YTNOTE_SKIP_BUCKET_CHECK=1 to skip it
+    entirely on deployments where the bucket is known to exist
+    """
+    global _bucket_ready
+    if _bucket_ready or os.getenv("YTNOTE_SKIP_BUCKET_CHECK"):
+        return True
+    
     try:
-        # Check if bucket exists
-        buckets = supabase.storage.list_buckets()
-        bucket_names = [b.name for b in buckets]
-        
-        if BUCKET_NAME not in bucket_names:
-            # Create bucket with public access for reading
-            supabase.storage.create_bucket(
+        # Look up just this bucket (cheaper than listing every bucket)
+        try:
+            _storage().get_bucket(BUCKET_NAME)
+            print(f"[STORAGE] Bucket exists: {BUCKET_NAME}")
+        except Exception:
+            _storage().create_bucket(
                 BUCKET_NAME,
                 options={"public": False}  # Keep private, access via signed URLs
             )
             print(f"[STORAGE] Created bucket: {BUCKET_NAME}")
-        else:
-            print(f"[STORAGE] Bucket exists: {BUCKET_NAME}")
+        _bucket_ready = True
         return True
     except Exception as e:
         print(f"[STORAGE!!] Error with bucket: {str(e)}")
         return False
 
 
+def chunk_text_path_for(video_id: str, chunk_id: int) -> str:
+    """Storage path a chunk's text is uploaded to (video_id/chunk_N.txt.gz)"""
+    return f"{video_id}/chunk_{chunk_id}.txt.gz"
+
+
+def _decode_chunk_text(data: bytes) -> str:
+    """Decode a stored chunk body - gzip objects and older plain .txt files alike"""
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
+
+
 def upload_chunk_text(video_id: str, chunk_id: int, chunk_text: str) -> Optional[str]:
     """
     Upload chunk text to storage
@@ -52,43 +97,48 @@ def upload_chunk_text(video_id: str, chunk_id: int, chunk_text: str) -> Optional
         chunk_text: Text content to upload
         
     Returns:
-        Storage path (e.g., "video_id/chunk_0.txt") or None on error
+        Storage path (e.g., "video_id/chunk_1.txt.gz") or None on error
     """
     try:
-        # Create path: video_id/chunk_N.txt
-        chunk_text_path = f"{video_id}/chunk_{chunk_id}.txt"
+        # Create path: video_id/chunk_N.txt.gz
+        chunk_text_path = chunk_text_path_for(video_id, chunk_id)
+        body = gzip.compress(chunk_text.encode('utf-8'), compresslevel=6)
         
-        # Upload to storage
-        supabase.storage.from_(BUCKET_NAME).upload(
+        # Upload to storage (creates or overwrites)
+        _storage().from_(BUCKET_NAME).upload(
             chunk_text_path,
-            chunk_text.encode('utf-8'),
-            file_options={"content-type": "text/plain; charset=utf-8"}
+            body,
+            file_options=GZIP_FILE_OPTIONS
         )
         
         print(f"[STORAGE->] Uploaded {chunk_text_path} ({len(chunk_text)} chars)")
+        _text_cache.set(chunk_text_path, chunk_text)
         return chunk_text_path
     except Exception as e:
-        # If file exists, update it
-        if "already exists" in str(e).lower():
-            try:
-                supabase.storage.from_(BUCKET_NAME).update(
-                    chunk_text_path,
-                    chunk_text.encode('utf-8'),
-                    file_options={"content-type": "text/plain; charset=utf-8"}
-                )
-                print(f"[STORAGE->] Updated {chunk_text_path} ({len(chunk_text)} chars)")
-                return chunk_text_path
-            except Exception as update_error:
-                print(f"[STORAGE!!] Error updating: {str(update_error)}")
-                return None
-        else:
-            print(f"[STORAGE!!] Error uploading: {str(e)}")
-            return None
+        print(f"[STORAGE!!] Error uploading: {str(e)}")
+        # The object may or may not have been replaced - don't serve the old text
+        _text_cache.invalidate(lambda path: path == chunk_text_path)
+        return None
+
+
+def submit_chunk_text_upload(video_id: str, chunk_id: int, chunk_text: str) -> "Future[Optional[str]]":
+    """
+    Start uploading a chunk text in the background
+    
+    Args:
+        video_id: YouTube video ID
+        chunk_id: Chunk identifier
+        chunk_text: Text content to upload
+        
+    Returns:
+        Future resolving to the storage path (None on error)
+    """
+    return _transfer_pool.submit(upload_chunk_text, video_id, chunk_id, chunk_text)
 
 
 def download_chunk_text(chunk_text_path: str) -> Optional[str]:
     """
-    Download chunk text from storage
+    Download chunk text from storage (served from an in-process cache when possible)
     
     Args:
         chunk_text_path: Path in storage (e.g., "video_id/chunk_0.txt")
@@ -96,16 +146,70 @@ def download_chunk_text(chunk_text_path: str) -> Optional[str]:
     Returns:
         Chunk text or None on error
     """
+    cached = _text_cache.get(chunk_text_path)
+    if cached is not MISSING:
+        return cached
+    
     try:
-        response = supabase.storage.from_(BUCKET_NAME).download(chunk_text_path)
-        text = response.decode('utf-8')
+        response = _storage().from_(BUCKET_NAME).download(chunk_text_path)
+        text = _decode_chunk_text(response)
         print(f"[STORAGE<-] Downloaded {chunk_text_path} ({len(text)} chars)")
+        _text_cache.set(chunk_text_path, text)
         return text
     except Exception as e:
         print(f"[STORAGE!!] Error downloading {chunk_text_path}: {str(e)}")
         return None
 
 
+def submit_chunk_text_download(chunk_text_path: str) -> "Future[Optional[str]]":
+    """
+    Start downloading a chunk text in the background
+    Lets callers overlap the storage round-trip with a DB query
+    
+    Args:
+        chunk_text_path: Path in storage
+        
+    Returns:
+        Future resolving to the chunk text (None on error)
+    """
+    return _transfer_pool.submit(download_chunk_text, chunk_text_path)
+
+
+def download_chunk_texts(chunk_text_paths: List[str]) -> List[Optional[str]]:
+    """
+    Download several chunk texts concurrently
+    Wall time is roughly one round-trip per MAX_TRANSFER_WORKERS files
+    instead of one per file
+    
+    Args:
+        chunk_text_paths: Paths in storage
+        
+    Returns:
+        Texts in the same order as the paths (None for failed downloads)
+    """
+    if len(chunk_text_paths) <= 1:
+        return [download_chunk_text(path) for path in chunk_text_paths]
+    return list(_transfer_pool.map(download_chunk_text, chunk_text_paths))
+
+
+# Page size for folder listings (storage list() returns 100 entries unless told otherwise)
+LIST_PAGE_SIZE = 1000
+
+
+def _list_video_files(video_id: str) -> List[str]:
+    """Every file path in a video's folder, paging through list() until it runs out"""
+    file_paths = []
+    offset = 0
+    while True:
+        page = _storage().from_(BUCKET_NAME).list(
+            video_id, {"limit": LIST_PAGE_SIZE, "offset": offset}
+        ) or []
+        file_paths.extend(f"{video_id}/{file['name']}" for file in page)
+        if len(page) < LIST_PAGE_SIZE:
+            return file_paths
+        offset += LIST_PAGE_SIZE
+
+
 def delete_video_chunks_from_storage(video_id: str) -> bool:
     """
     Delete all chunk files for a video from storage
@@ -113,22 +217,64 @@ def delete_video_chunks_from_storage(video_id: str) -> bool:
     Args:
         video_id: YouTube video ID
         
+    Returns:
+        True if successful, False otherwise
+    """
+    return delete_videos_chunks_from_storage([video_id])
+
+
+def delete_videos_chunks_from_storage(video_ids: List[str]) -> bool:
+    """
+    Delete all chunk files for several videos (one remove() per 1000 files)
+    
+    Args:
+        video_ids: YouTube video IDs
+        
     Returns:
         True if successful, False otherwise
     """
     try:
-        # List all files in the video's folder
-        files = supabase.storage.from_(BUCKET_NAME).list(video_id)
+        # Drop cached texts first so a failed delete can't leave them served
+        prefixes = tuple(f"{video_id}/" for video_id in video_ids)
+        _text_cache.invalidate(lambda path: path.startswith(prefixes))
+        
+        # List all files in each video's folder
+        file_paths = [path for video_id in video_ids for path in _list_video_files(video_id)]
         
-        if not files:
-            print(f"[STORAGE] No files found for video {video_id}")
+        if not file_paths:
+            print(f"[STORAGE] No files found for {len(video_ids)} videos")
             return True
         
-        # Delete each file
-        file_paths = [f"{video_id}/{file['name']}" for file in files]
-        supabase.storage.from_(BUCKET_NAME).remove(file_paths)
+        # remove() takes at most 1000 paths per request
+        for start in range(0, len(file_paths), 1000):
+            _storage().from_(BUCKET_NAME).remove(file_paths[start:start + 1000])
+        
+        print(f"[STORAGE] Deleted {len(file_paths)} files for {len(video_ids)} videos")
+        return True
+    except Exception as e:
+        print(f"[STORAGE!!] Error deleting files: {str(e)}")
+        return False
+
+
+def delete_chunk_files_from_storage(chunk_text_paths: List[str]) -> bool:
+    """
+    Delete known chunk files from storage (no folder listing needed)
+    
+    Args:
+        chunk_text_paths: Paths in storage
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        paths = set(chunk_text_paths)
+        _text_cache.invalidate(lambda path: path in paths)
+        
+        # remove() takes at most 1000 paths per request
+        for start in range(0, len(chunk_text_paths), 1000):
+            _storage().from_(BUCKET_NAME).remove(chunk_text_paths[start:start + 1000])
         
-        print(f"[STORAGE] Deleted {len(file_paths)} files for video {video_id}")
+        print(f"[STORAGE] Deleted {len(chunk_text_paths)} files")
         return True
     except Exception as e:
         print(f"[STORAGE!!] Error deleting files: {str(e)}")
@@ -146,7 +292,8 @@ def delete_chunk_from_storage(chunk_text_path: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        supabase.storage.from_(BUCKET_NAME).remove([chunk_text_path])
+        _text_cache.invalidate(lambda path: path == chunk_text_path)
+        _storage().from_(BUCKET_NAME).remove([chunk_text_path])
         print(f"[STORAGE] Deleted {chunk_text_path}")
         return True
     except Exception as e:
@@ -0,0 +1,230 @@
+"""
+Shared Supabase client factory
+Every client built here shares one pooled, keep-alive HTTP/2 transport,
+so CRUD calls reuse open connections instead of paying a TLS handshake
+"""
+
+import atexit
+import functools
+import logging
+import os
+import random
+import time
+import httpx
+from dotenv import load_dotenv
+from typing import Any, Dict, Optional
+from postgrest.exceptions import APIError
+from supabase import create_client, acreate_client, AsyncClient, Client, ClientOptions
+
+log = logging.getLogger("db.client")
+
+# Connection pool shared by all Supabase clients in the backend
+# (PostgREST and Storage both send absolute URLs, so one pool serves every project)
+# The transport retries failed connection attempts; the timeout covers storage uploads too
+http_client = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=60, max_keepalive_connections=40, keepalive_expiry=60)
+    ),
+    timeout=httpx.Timeout(30.0),
+    follow_redirects=True
+)
+
+# Close pooled connections cleanly on interpreter shutdown
+atexit.register(http_client.close)
+
+# Transient statuses worth retrying (rate limit / gateway / upstream unavailable)
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+# PostgREST codes for "could not reach / get a connection to Postgres"
+RETRYABLE_PGRST_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+
+
+def create_pooled_client(url: str, key: str) -> Client:
+    """
+    Create a Supabase client that uses the shared connection pool
+    
+    Args:
+        url: Supabase project URL
+        key: Supabase API key (service key for backend modules)
+        
+    Returns:
+        Supabase client
+    """
+    # Timeouts come from http_client (ClientOptions timeouts are ignored when one is passed)
+    options = ClientOptions(httpx_client=http_client)
+    return create_client(url, key, options=options)
+
+
+@functools.lru_cache(maxsize=1)
+def load_env() -> None:
+    """
+    Load backend/.env once per process (searches up the directory tree)
+    Modules call this (or go through the client getters) instead of
+    parsing .env themselves at import time
+    """
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=1)
+def get_service_client() -> Client:
+    """
+    Service-role client for the primary project (SUPABASE_URL), built on first use
+    Shared by every primary-project CRUD and storage module so they all go
+    through one client and one connection pool
+    
+    Returns:
+        Supabase client
+    """
+    load_env()
+    return create_pooled_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_books_client() -> Client:
+    """
+    Service-role client for the 2nd project (SUPABASE_URL_2: books, chapters, book notes)
+    
+    Returns:
+        Supabase client
+    """
+    load_env()
+    return create_pooled_client(
+        os.getenv("SUPABASE_URL_2"),
+        os.getenv("SUPABASE_SERVICE_KEY_2")
+    )
+
+
+# Optional direct Postgres driver (not a hard requirement - callers fall back to PostgREST)
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+_async_service_client: Optional[AsyncClient] = None
+
+
+async def get_async_service_client() -> AsyncClient:
+    """
+    Async service-role client for the primary project, for the a* CRUD variants
+    Created on first await (it needs a running event loop) and shared after that
+    
+    Returns:
+        Async Supabase client
+    """
+    global _async_service_client
+    if _async_service_client is None:
+        load_env()
+        _async_service_client = await acreate_client(
+            os.getenv("SUPABASE_URL"),
+            os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+        )
+    return _async_service_client
+
+
+async def create_pg_pool(min_size: int = 1, max_size: int = 5, max_idle_seconds: float = 1800):
+    """
+    asyncpg pool on SUPABASE_DB_URL, set up for Supabase's Transaction Pooler (port 6543)
+    Open every direct Postgres pool through this. The pooler hands each
+    transaction to whichever server connection is free, so named prepared
+    statements (asyncpg's statement cache, or an explicit conn.prepare())
+    vanish between calls and fail under burst load - never prepare() on it
+    
+    Args:
+        min_size: Connections opened up front
+        max_size: Upper bound (the pooler multiplexes these, keep it small)
+        max_idle_seconds: Idle connections are closed after this long
+        
+    Returns:
+        asyncpg pool, or None if asyncpg/SUPABASE_DB_URL are unavailable
+    """
+    if asyncpg is None:
+        return None
+    
+    load_env()
+    database_url = os.getenv("SUPABASE_DB_URL")
+    if not database_url:
+        return None
+    
+    return await asyncpg.create_pool(
+        database_url,
+        min_size=min_size,
+        max_size=max_size,
+        max_inactive_connection_lifetime=max_idle_seconds,
+        statement_cache_size=0
+    )
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header, if the error carries an HTTP response"""
+    response = getattr(error, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIError):
+        # Non-JSON gateway errors carry the HTTP status as the code
+        return str(error.code) in {str(s) for s in RETRYABLE_STATUSES} \
+            or error.code in RETRYABLE_PGRST_CODES
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+def execute_with_retry(query: Any, retries: int = 5, base: float = 0.2) -> Any:
+    """
+    Execute a PostgREST query, retrying transient failures with exponential
+    backoff and jitter (honouring Retry-After when present)
+    
+    Only use for idempotent writes - upserts/updates/deletes keyed on the
+    row's natural key - so a retry after a lost response can't duplicate rows
+    
+    Args:
+        query: Built request (e.g. supabase.table(...).upsert(...))
+        retries: Extra attempts after the first one
+        base: Initial backoff in seconds, doubled per attempt
+        
+    Returns:
+        The query's APIResponse; the last error is re-raised when retries run out
+    """
+    for attempt in range(retries + 1):
+        try:
+            return query.execute()
+        except Exception as e:
+            if attempt == retries or not _is_retryable(e):
+                raise
+            delay = _retry_after(e) or base * 2 ** attempt + random.random() * 0.1
+            log.warning("[DB!!] Transient error (%s), retry %s/%s in %.2fs", e, attempt + 1, retries, delay)
+            time.sleep(delay)
+
+
+def upsert_and_get(table: Any, data: Dict[str, Any], pk: str) -> Optional[Dict[str, Any]]:
+    """
+    Upsert one row and return the stored row from the same request
+    (Prefer: return=representation), so callers never need a follow-up
+    SELECT - and never read back a stale row
+    
+    Args:
+        table: Table request builder (e.g. supabase.table("video_notes"))
+        data: Row to write
+        pk: Conflict column(s), e.g. "video_id"
+        
+    Returns:
+        The row as stored (defaults/triggers applied) or None if nothing came back;
+        errors are raised like execute_with_retry
+    """
+    response = execute_with_retry(table.upsert(
+        data,
+        on_conflict=pk,
+        ignore_duplicates=False,
+        returning="representation"
+    ))
+    return response.data[0] if response.data else None
@@ -0,0 +1,179 @@
+"""
+Small thread-safe in-process LRU cache with per-entry TTL
+Used by the CRUD modules to avoid re-querying rarely changing rows
+PageCache adds stale-while-revalidate for hot list pages on top of it
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+log = logging.getLogger("db.cache")
+
+# Returned by get() on a miss so that falsy values can still be cached
+MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire ttl seconds after being set
+    Oldest entries are evicted once maxsize is reached
+    
+    With stale_ttl > 0, expired entries are kept for that many extra seconds
+    so get_stale() can serve them while the caller refreshes in the background
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or MISSING if absent/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at < now:
+                if expires_at + self.stale_ttl < now:
+                    del self._entries[key]
+                return MISSING
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def get_stale(self, key: Hashable) -> Tuple[Any, bool]:
+        """
+        Return (value, is_stale) - expired entries still inside the stale_ttl
+        window come back with is_stale=True; (MISSING, False) on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING, False
+            
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at + self.stale_ttl < now:
+                del self._entries[key]
+                return MISSING, False
+            
+            self._entries.move_to_end(key)
+            return value, expires_at < now
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches predicate; returns count removed"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+class PageCache:
+    """
+    Stale-while-revalidate cache for hot list queries (the first pages of
+    the notes/videos lists), keyed by the query arguments
+    
+    Fresh pages are served from memory; pages past ttl are still served
+    (up to stale_ttl longer) while a daemon thread reloads them. Writes call
+    invalidate(), which also bumps a generation so a load that started
+    before the write can't store the old rows afterwards
+    """
+    
+    def __init__(self, maxsize: int = 32, ttl: float = 30, stale_ttl: float = 300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._refreshing: set = set()
+    
+    def get(self, key: Hashable, load: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Return the rows for key, calling load() on a miss
+        Rows are copied, so callers may modify them; load() errors propagate
+        """
+        rows, stale = self._cache.get_stale(key)
+        if rows is MISSING:
+            rows = self._load(key, load)
+        elif stale:
+            self._refresh_in_background(key, load)
+        return [dict(row) for row in rows]
+    
+    def get_page(
+        self,
+        key: Tuple,
+        offset: int,
+        limit: int,
+        load_range: Callable[[int, int], List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Paginated get: a miss loads this page and the next one in one widened
+        query (offset, 2 * limit) and caches both, so sequential paging runs
+        one sorted scan per two pages
+        
+        Args:
+            key: Query arguments other than offset/limit
+            offset: Rows to skip
+            limit: Page size
+            load_range: Called as load_range(offset, count), returns up to count rows
+        """
+        def load_pages() -> List[Dict[str, Any]]:
+            generation = self._generation
+            rows = load_range(offset, 2 * limit)
+            with self._lock:
+                if generation == self._generation:
+                    self._cache.set(key + (offset + limit, limit), [dict(row) for row in rows[limit:]])
+            return rows[:limit]
+        
+        return self.get(key + (offset, limit), load_pages)
+    
+    def invalidate(self) -> None:
+        """Drop every cached page (call after any write to the underlying table)"""
+        with self._lock:
+            self._generation += 1
+        self._cache.clear()
+    
+    def _load(self, key: Hashable, load: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        generation = self._generation
+        rows = load()
+        with self._lock:
+            if generation == self._generation:
+                self._cache.set(key, [dict(row) for row in rows])
+        return rows
+    
+    def _refresh_in_background(self, key: Hashable, load: Callable[[], List[Dict[str, Any]]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self._load(key, load)
+            except Exception as e:
+                log.error("[DB!!] Page refresh failed: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=refresh, daemon=True).start()
@@ -3,19 +3,109 @@ CRUD operations for video notes in Supabase
 Handles storing and retrieving markdown notes for YouTube videos
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from typing import Optional, Dict, Any, List
+import logging
+import threading
+from concurrent.futures import Future
+from supabase import Client
+from .supabase_client import get_service_client, get_async_service_client, execute_with_retry, upsert_and_get
+from .ttl_cache import PageCache
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
-# Load environment variables from backend/.env (searches up the directory tree)
-load_dotenv()
+# DB trace logging - DEBUG level, so the hot paths skip formatting unless enabled
+log = logging.getLogger("db.notes")
 
-# Initialize Supabase client with SERVICE ROLE key (server-only, bypasses RLS)
-url: str = os.getenv("SUPABASE_URL")
-key: str = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(url, key)
+
+def _sb() -> Client:
+    """
+    Shared SERVICE ROLE client (server-only, bypasses RLS)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_service_client()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.video_notes_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Note list projections - the embedded youtube_videos fields are always included
+NOTE_LIST_COLUMNS = "video_id, note_content, created_at, updated_at"
+NOTE_SUMMARY_COLUMNS = "video_id, created_at, updated_at"
+NOTE_VIDEO_COLUMNS = "title, channel_title, published_at"
+
+# Single-note projections - NOTE_META_FIELDS skips the note_content markdown
+# (must include video_id, which results are keyed by)
+NOTE_META_FIELDS = "video_id,updated_at,custom_tags"
+NOTE_FULL_FIELDS = "*"
+
+# Hot note list pages (dashboard / notes list), keyed by query arguments.
+# Served from memory and refreshed in the background once 30 s old;
+# note writes in this module drop them
+_note_pages = PageCache(maxsize=32, ttl=30)
+
+
+class _NoteLoader:
+    """
+    DataLoader-style coalescer for get_note_by_video_id
+    The first caller queries right away; callers arriving while that SELECT
+    is in flight queue up and share the next one (video_id IN (...)), so a
+    lone lookup pays no batching delay. Each caller blocks on a Future that
+    resolves to its own note
+    """
+    
+    def __init__(self, max_batch: int = 200):
+        self.max_batch = max_batch  # ids per request (keeps the IN (...) URL short)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Future]] = {}
+        self._busy = False
+    
+    def load(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Queue a lookup and block until its batch has been fetched"""
+        future: Future = Future()
+        
+        with self._lock:
+            self._pending.setdefault(video_id, []).append(future)
+            leader = not self._busy
+            self._busy = True
+        
+        # The caller that found the loader idle runs batches until the queue is empty
+        if leader:
+            self._drain()
+        return future.result()
+    
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._busy = False
+                    return
+                batch, self._pending = self._pending, {}
+            
+            video_ids = list(batch)
+            for start in range(0, len(video_ids), self.max_batch):
+                part = video_ids[start:start + self.max_batch]
+                try:
+                    notes = _fetch_notes(part)
+                    for video_id in part:
+                        for future in batch[video_id]:
+                            future.set_result(notes.get(video_id))
+                except Exception as e:
+                    for video_id in part:
+                        for future in batch[video_id]:
+                            future.set_exception(e)
+
+
+def _fetch_notes(video_ids: List[str], fields: str = NOTE_FULL_FIELDS) -> Dict[str, Dict[str, Any]]:
+    """SELECT the notes for several videos in one request (raises on error)"""
+    log.debug("[DB->] SELECT video_notes WHERE video_id IN (%s ids)", len(video_ids))
+    response = _sb().table("video_notes").select(fields).in_("video_id", video_ids).execute()
+    return {note['video_id']: note for note in response.data or []}
+
+
+_note_loader = _NoteLoader()
 
 
 def create_or_update_note(
@@ -41,101 +131,195 @@ def create_or_update_note(
             'custom_tags': custom_tags or []
         }
         
-        print(f"[DB->] UPSERT video_notes (video_id={video_id}, content_len={len(note_content)}, tags={len(custom_tags or [])})")
-        response = supabase.table("video_notes").upsert(
-            note_data,
-            on_conflict='video_id'
-        ).execute()
+        log.debug("[DB->] UPSERT video_notes (video_id=%s, content_len=%s, tags=%s)", video_id, len(note_content), len(custom_tags or []))
+        note = upsert_and_get(_sb().table("video_notes"), note_data, 'video_id')
+        _note_pages.invalidate()
         
-        if response.data and len(response.data) > 0:
-            print(f"[DB<-] Note saved for video: {video_id}")
-            return response.data[0]
+        if note:
+            log.debug("[DB<-] Note saved for video: %s", video_id)
+            return note
         else:
-            print(f"[DB!!] Failed to save note for video: {video_id}")
+            log.warning("[DB!!] Failed to save note for video: %s", video_id)
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
-def get_note_by_video_id(video_id: str) -> Optional[Dict[str, Any]]:
+def get_note_by_video_id(video_id: str, fields: str = NOTE_FULL_FIELDS) -> Optional[Dict[str, Any]]:
     """
     Get note for a specific video
     
     Args:
         video_id: YouTube video ID
+        fields: Columns to select; pass NOTE_META_FIELDS when note_content isn't needed
+        
+    Returns:
+        Note record or None if not found
+    """
+    try:
+        if fields == NOTE_FULL_FIELDS:
+            # Concurrent lookups are coalesced into one IN (...) query
+            note = _note_loader.load(video_id)
+        else:
+            note = _fetch_notes([video_id], fields).get(video_id)
+        
+        if note:
+            log.debug("[DB<-] Found note for video: %s", video_id)
+            return note
+        else:
+            log.debug("[DB<-] No note found for video: %s", video_id)
+            return None
+            
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return None
+
+
+async def aget_note_by_video_id(video_id: str, fields: str = NOTE_FULL_FIELDS) -> Optional[Dict[str, Any]]:
+    """
+    Async version of get_note_by_video_id - awaits the query instead of blocking
+    the event loop, so handlers can asyncio.gather it with other reads
+    
+    Args:
+        video_id: YouTube video ID
+        fields: Columns to select; pass NOTE_META_FIELDS when note_content isn't needed
         
     Returns:
         Note record or None if not found
     """
     try:
-        print(f"[DB->] SELECT video_notes WHERE video_id={video_id}")
-        response = supabase.table("video_notes").select("*").eq("video_id", video_id).execute()
+        client = await get_async_service_client()
+        log.debug("[DB->] SELECT video_notes WHERE video_id=%s (async)", video_id)
+        response = await client.table("video_notes").select(fields).eq("video_id", video_id).execute()
         
-        if response.data and len(response.data) > 0:
-            print(f"[DB<-] Found note for video: {video_id}")
+        if response.data:
+            log.debug("[DB<-] Found note for video: %s", video_id)
             return response.data[0]
         else:
-            print(f"[DB<-] No note found for video: {video_id}")
+            log.debug("[DB<-] No note found for video: %s", video_id)
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
-def get_all_notes(limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+def get_notes_by_video_ids(
+    video_ids: List[str],
+    fields: str = NOTE_META_FIELDS
+) -> Dict[str, Dict[str, Any]]:
     """
-    Get all notes
+    Get notes for several videos in one query (e.g. for list views)
     
     Args:
-        limit: Maximum number of records to return
-        offset: Number of records to skip
+        video_ids: YouTube video IDs
+        fields: Columns to select; pass NOTE_FULL_FIELDS to include note_content
         
     Returns:
-        List of note records
+        Dict of video_id -> note record (videos without a note are absent; empty on error)
     """
+    if not video_ids:
+        return {}
+    
     try:
-        print(f"[DB->] SELECT video_notes (limit={limit}, offset={offset})")
-        query = supabase.table("video_notes").select("*")
+        notes = _fetch_notes(list(dict.fromkeys(video_ids)), fields)
+        log.debug("[DB<-] Found %s notes for %s videos", len(notes), len(video_ids))
+        return notes
         
-        response = query.order("updated_at", desc=True).range(offset, offset + limit - 1).execute()
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return {}
+
+
+def get_all_notes(
+    limit: int = 50,
+    cursor: Optional[Tuple[str, str]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, str]]]:
+    """
+    Get all notes, newest first, one keyset page at a time
+    Pages seek past the cursor on (updated_at, video_id) instead of using an
+    OFFSET, so deep pages cost the same as the first one
+    
+    Args:
+        limit: Maximum number of records to return
+        cursor: next_cursor from the previous page (None for the first page)
+        
+    Returns:
+        (note records, next_cursor) - next_cursor is None on the last page
+    """
+    def load() -> List[Dict[str, Any]]:
+        log.debug("[DB->] SELECT video_notes (limit=%s, cursor=%s)", limit, cursor)
+        query = _sb().table("video_notes").select("*")
+        
+        if cursor:
+            updated_at, video_id = cursor
+            query = query.or_(
+                f'updated_at.lt."{updated_at}",'
+                f'and(updated_at.eq."{updated_at}",video_id.lt."{video_id}")'
+            )
+        
+        response = query.order("updated_at", desc=True).order("video_id", desc=True).limit(limit).execute()
         
-        print(f"[DB<-] Retrieved {len(response.data) if response.data else 0} notes")
+        log.debug("[DB<-] Retrieved %s notes", len(response.data) if response.data else 0)
         return response.data if response.data else []
+    
+    try:
+        notes = _note_pages.get(("get_all_notes", cursor, limit), load)
+        
+        next_cursor = None
+        if len(notes) == limit:
+            next_cursor = (notes[-1]['updated_at'], notes[-1]['video_id'])
+        return notes, next_cursor
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
-        return []
+        log.error("[DB!!] %s", e)
+        return [], None
 
 
-def get_notes_with_video_info(limit: int = 50) -> List[Dict[str, Any]]:
+def get_notes_with_video_info(
+    limit: int = 50,
+    offset: int = 0,
+    columns: str = NOTE_LIST_COLUMNS,
+    channel: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """
     Get all notes with associated video information
-    Uses a JOIN to combine video_notes and youtube_videos tables
+    Uses PostgREST resource embedding (one request, joined in the database)
     
     Args:
         limit: Maximum number of records to return
+        offset: Number of records to skip
+        columns: video_notes columns to return; pass NOTE_SUMMARY_COLUMNS to
+                 leave out note_content when only titles are rendered
+        channel: Only notes whose video's channel_title contains this (case-insensitive),
+                 filtered in the database
         
     Returns:
-        List of note records with video information
+        List of note records with video information (under 'youtube_videos')
     """
-    try:
-        print(f"[DB->] SELECT video_notes JOIN youtube_videos (limit={limit})")
-        # Select note fields and join with video info
-        query = supabase.table("video_notes").select(
-            "video_id, note_content, created_at, updated_at, "
-            "youtube_videos(title, channel_title, published_at)"
-        )
+    def load_range(start: int, count: int) -> List[Dict[str, Any]]:
+        log.debug("[DB->] SELECT video_notes JOIN youtube_videos (limit=%s, offset=%s, channel=%s)", count, start, channel)
+        # !inner turns the embed into an inner join, so the channel filter drops notes
+        embed = "youtube_videos!inner" if channel else "youtube_videos"
+        query = _sb().table("video_notes").select(f"{columns}, {embed}({NOTE_VIDEO_COLUMNS})")
+        if channel:
+            query = query.ilike("youtube_videos.channel_title", f"%{channel}%")
         
-        response = query.order("updated_at", desc=True).limit(limit).execute()
+        response = query.order("updated_at", desc=True).range(start, start + count - 1).execute()
         
-        print(f"[DB<-] Retrieved {len(response.data) if response.data else 0} notes with video info")
+        log.debug("[DB<-] Retrieved %s notes with video info", len(response.data) if response.data else 0)
         return response.data if response.data else []
+    
+    try:
+        # Channel searches are one-off queries - only the plain list pages are cached
+        if channel:
+            return load_range(offset, limit)
+        return _note_pages.get_page(("get_notes_with_video_info", columns), offset, limit, load_range)
         
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return []
 
 
@@ -150,18 +334,19 @@ def delete_note(video_id: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        print(f"[DB->] DELETE video_notes WHERE video_id={video_id}")
-        response = supabase.table("video_notes").delete().eq("video_id", video_id).execute()
+        log.debug("[DB->] DELETE video_notes WHERE video_id=%s", video_id)
+        response = execute_with_retry(_sb().table("video_notes").delete().eq("video_id", video_id))
+        _note_pages.invalidate()
         
         if response.data:
-            print(f"[DB<-] Deleted note for video: {video_id}")
+            log.debug("[DB<-] Deleted note for video: %s", video_id)
             return True
         else:
-            print(f"[DB<-] No note to delete for video: {video_id}")
+            log.debug("[DB<-] No note to delete for video: %s", video_id)
             return False
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return False
 
 
@@ -184,7 +369,7 @@ if __name__ == "__main__":
         print("   Note not found")
     
     print("\n3. Getting all notes:")
-    notes = get_all_notes()
+    notes, next_cursor = get_all_notes()
     print(f"   Found {len(notes)} notes")
     
     print("\n4. Getting notes with video info:")
@@ -3,19 +3,71 @@ CRUD operations for YouTube videos in Supabase
 Handles storing and retrieving YouTube video data from the database
 """
 
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from supabase import Client
+from .supabase_client import get_service_client, get_async_service_client, execute_with_retry, upsert_and_get
+from .ttl_cache import TTLCache, PageCache, MISSING
+from postgrest.exceptions import APIError
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
-# Load environment variables from backend/.env (searches up the directory tree)
-load_dotenv()
+# DB trace logging - DEBUG level, so the hot paths skip formatting unless enabled
+log = logging.getLogger("db.videos")
 
-# Initialize Supabase client with SERVICE ROLE key (server-only, bypasses RLS)
-url: str = os.getenv("SUPABASE_URL")
-key: str = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(url, key)
+
+def _sb() -> Client:
+    """
+    Shared SERVICE ROLE client (server-only, bypasses RLS)
+    Resolved on first use so importing this module does no client setup
+    """
+    return get_service_client()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from db.youtube_crud import supabase` working for scripts
+    if name == "supabase":
+        return _sb()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Hot video list pages (videos list / recently updated), keyed by query arguments.
+# Served from memory and refreshed in the background once 30 s old;
+# video writes in this module drop them
+_video_pages = PageCache(maxsize=32, ttl=30)
+
+# Full youtube_videos rows by id. This module is the only writer, so entries
+# stay valid for an hour; create_or_update_video compares their etag to skip
+# unchanged re-upserts
+_video_records = TTLCache(maxsize=512, ttl=3600)
+
+# bulk_create_or_update_videos sends rows in batches of this size, a few at a time
+# (keeps each upsert well under PostgREST's statement timeout)
+VIDEO_UPSERT_BATCH_SIZE = 50
+VIDEO_UPSERT_WORKERS = 4
+
+# get_video_by_id projections - existence checks only need the id,
+# not the (often long) description
+VIDEO_ID_FIELDS = "id"
+VIDEO_FULL_FIELDS = "*"
+
+# Materialized view of the videos updated in the last 24 h (up to 200 rows),
+# refreshed every 5 minutes - see .db apply/recent_videos_materialized_view.sql
+RECENT_VIDEOS_VIEW = "recent_videos_24h"
+RECENT_VIDEOS_VIEW_HOURS = 24
+RECENT_VIDEOS_VIEW_ROWS = 200
+
+
+def _to_count(value: Any) -> int:
+    """YouTube statistics come back as strings; missing/blank/'None' counts become 0"""
+    # Hidden counts are the common bad case - skip raising for them
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
 
 
 def parse_youtube_video_data(video_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -28,10 +80,10 @@ def parse_youtube_video_data(video_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary formatted for database insertion
     """
-    snippet = video_data.get('snippet', {})
-    content_details = video_data.get('contentDetails', {})
-    status = video_data.get('status', {})
-    statistics = video_data.get('statistics', {})
+    snippet = video_data.get('snippet') or {}
+    content_details = video_data.get('contentDetails') or {}
+    status = video_data.get('status') or {}
+    statistics = video_data.get('statistics') or {}
     
     # Parse data
     parsed_data = {
@@ -51,13 +103,13 @@ def parse_youtube_video_data(video_data: Dict[str, Any]) -> Dict[str, Any]:
         'default_audio_language': snippet.get('defaultAudioLanguage'),
         
         # Tags as array
-        'tags': snippet.get('tags', []),
+        'tags': snippet.get('tags') or [],
         
         # Content details
         'duration': content_details.get('duration'),
         'dimension': content_details.get('dimension'),
         'definition': content_details.get('definition'),
-        'caption': content_details.get('caption') == 'true' or content_details.get('caption') == True,
+        'caption': content_details.get('caption') in ('true', True),
         'licensed_content': content_details.get('licensedContent'),
         'projection': content_details.get('projection'),
         
@@ -70,19 +122,35 @@ def parse_youtube_video_data(video_data: Dict[str, Any]) -> Dict[str, Any]:
         'made_for_kids': status.get('madeForKids'),
         
         # Statistics (as integers)
-        'view_count': int(statistics.get('viewCount', 0)),
-        'like_count': int(statistics.get('likeCount', 0)),
-        'favorite_count': int(statistics.get('favoriteCount', 0)),
-        'comment_count': int(statistics.get('commentCount', 0)),
+        'view_count': _to_count(statistics.get('viewCount')),
+        'like_count': _to_count(statistics.get('likeCount')),
+        'favorite_count': _to_count(statistics.get('favoriteCount')),
+        'comment_count': _to_count(statistics.get('commentCount')),
     }
     
     return parsed_data
 
 
+def _stored_etag(video_id: str) -> Optional[str]:
+    """Etag of the stored row (narrow SELECT, no description), or None if absent"""
+    log.debug("[DB->] SELECT youtube_videos id,etag WHERE id=%s", video_id)
+    response = _sb().table("youtube_videos").select("id,etag").eq("id", video_id).execute()
+    return response.data[0].get('etag') if response.data else None
+
+
+def _unchanged_video(parsed_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Cached row for this video if YouTube's etag says nothing changed since it was stored"""
+    cached = _video_records.get(parsed_data.get('id'))
+    if cached is not MISSING and parsed_data.get('etag') and cached.get('etag') == parsed_data['etag']:
+        return dict(cached)
+    return None
+
+
 def create_or_update_video(video_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Create a new video record or update existing one
-    Uses upsert to handle both create and update operations
+    Uses upsert to handle both create and update operations; the write is
+    skipped when the stored row has the same etag (the video is unchanged)
     
     Args:
         video_data: Raw video data from YouTube API
@@ -93,28 +161,36 @@ def create_or_update_video(video_data: Dict[str, Any]) -> Optional[Dict[str, Any
     try:
         parsed_data = parse_youtube_video_data(video_data)
         
-        print(f"[DB->] UPSERT youtube_videos (id={parsed_data.get('id')}, title={parsed_data.get('title', '')[:30]}...)")
-        response = supabase.table("youtube_videos").upsert(
-            parsed_data,
-            on_conflict='id'
-        ).execute()
+        unchanged = _unchanged_video(parsed_data)
+        if not unchanged and parsed_data.get('etag') and _video_records.get(parsed_data['id']) is MISSING:
+            # Not cached - compare against the stored etag before loading the full row
+            if _stored_etag(parsed_data['id']) == parsed_data['etag']:
+                unchanged = get_video_by_id(parsed_data['id'])
+        if unchanged:
+            log.debug("[DB<-] Video unchanged (etag match), skipping upsert: %s", parsed_data['id'])
+            return unchanged
         
-        if response.data:
-            video_id = response.data[0].get('id')
-            print(f"[DB<-] Upserted video: {video_id}")
-            return response.data[0]
+        log.debug("[DB->] UPSERT youtube_videos (id=%s, title=%s...)", parsed_data.get('id'), parsed_data.get('title', '')[:30])
+        video = upsert_and_get(_sb().table("youtube_videos"), parsed_data, 'id')
+        _video_pages.invalidate()
+        
+        if video:
+            _video_records.set(video['id'], dict(video))
+            log.debug("[DB<-] Upserted video: %s", video.get('id'))
+            return video
         else:
-            print(f"[DB!!] No data returned for video upsert")
+            log.warning("[DB!!] No data returned for video upsert")
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
 def bulk_create_or_update_videos(videos_data: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
     """
     Bulk create or update multiple video records
+    Large inputs are split into VIDEO_UPSERT_BATCH_SIZE batches upserted concurrently
     
     Args:
         videos_data: List of raw video data from YouTube API
@@ -125,73 +201,141 @@ def bulk_create_or_update_videos(videos_data: List[Dict[str, Any]]) -> Optional[
     try:
         parsed_videos = [parse_youtube_video_data(video) for video in videos_data]
         
-        print(f"[DB->] BULK UPSERT youtube_videos (count={len(parsed_videos)})")
-        response = supabase.table("youtube_videos").upsert(
-            parsed_videos,
-            on_conflict='id'
-        ).execute()
+        # Only cached rows are compared here - no extra SELECT for a bulk crawl
+        unchanged = [row for row in map(_unchanged_video, parsed_videos) if row]
+        unchanged_ids = {row['id'] for row in unchanged}
+        parsed_videos = [video for video in parsed_videos if video['id'] not in unchanged_ids]
+        if unchanged:
+            log.debug("[DB<-] %s videos unchanged (etag match), skipping upsert", len(unchanged))
         
-        if response.data:
-            print(f"[DB<-] Upserted {len(response.data)} videos")
-            return response.data
+        batches = [
+            parsed_videos[start:start + VIDEO_UPSERT_BATCH_SIZE]
+            for start in range(0, len(parsed_videos), VIDEO_UPSERT_BATCH_SIZE)
+        ]
+        
+        def upsert_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            log.debug("[DB->] BULK UPSERT youtube_videos (count=%s)", len(batch))
+            return execute_with_retry(_sb().table("youtube_videos").upsert(
+                batch,
+                on_conflict='id'
+            )).data or []
+        
+        if len(batches) <= 1:
+            results = [upsert_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(VIDEO_UPSERT_WORKERS, len(batches))) as pool:
+                results = list(pool.map(upsert_batch, batches))
+        if batches:
+            _video_pages.invalidate()
+        
+        upserted = [video for result in results for video in result]
+        for video in upserted:
+            _video_records.set(video['id'], dict(video))
+        
+        upserted = unchanged + upserted
+        if upserted:
+            log.debug("[DB<-] Upserted %s videos", len(upserted))
+            return upserted
         else:
-            print(f"[DB!!] No data returned for bulk upsert")
+            log.warning("[DB!!] No data returned for bulk upsert")
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
-def get_video_by_id(video_id: str) -> Optional[Dict[str, Any]]:
+def get_video_by_id(video_id: str, fields: str = VIDEO_FULL_FIELDS) -> Optional[Dict[str, Any]]:
     """
     Get a single video by its ID
     
     Args:
         video_id: YouTube video ID
+        fields: Columns to select; pass VIDEO_ID_FIELDS for an existence check
         
     Returns:
         Video record or None if not found
     """
+    if fields == VIDEO_FULL_FIELDS:
+        cached = _video_records.get(video_id)
+        if cached is not MISSING:
+            return dict(cached)
+    
     try:
-        print(f"[DB->] SELECT youtube_videos WHERE id={video_id}")
-        response = supabase.table("youtube_videos").select("*").eq("id", video_id).execute()
+        log.debug("[DB->] SELECT youtube_videos WHERE id=%s", video_id)
+        response = _sb().table("youtube_videos").select(fields).eq("id", video_id).execute()
         
         if response.data and len(response.data) > 0:
-            print(f"[DB<-] Found video: {response.data[0].get('title', '')[:40]}")
+            log.debug("[DB<-] Found video: %s", response.data[0].get('title', video_id)[:40])
+            if fields == VIDEO_FULL_FIELDS:
+                _video_records.set(video_id, dict(response.data[0]))
+            return response.data[0]
+        else:
+            log.debug("[DB<-] Video not found: %s", video_id)
+            return None
+            
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return None
+
+
+async def aget_video_by_id(video_id: str, fields: str = VIDEO_FULL_FIELDS) -> Optional[Dict[str, Any]]:
+    """
+    Async version of get_video_by_id - awaits the query instead of blocking
+    the event loop, so handlers can asyncio.gather it with other reads
+    
+    Args:
+        video_id: YouTube video ID
+        fields: Columns to select; pass VIDEO_ID_FIELDS for an existence check
+        
+    Returns:
+        Video record or None if not found
+    """
+    try:
+        client = await get_async_service_client()
+        log.debug("[DB->] SELECT youtube_videos WHERE id=%s (async)", video_id)
+        response = await client.table("youtube_videos").select(fields).eq("id", video_id).execute()
+        
+        if response.data:
+            log.debug("[DB<-] Found video: %s", video_id)
             return response.data[0]
         else:
-            print(f"[DB<-] Video not found: {video_id}")
+            log.debug("[DB<-] Video not found: %s", video_id)
             return None
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
-def get_all_videos(limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+def get_all_videos(limit: int = 100, offset: int = 0) -> Optional[List[Dict[str, Any]]]:
     """
     Get all videos (with optional limit)
     
     Args:
         limit: Maximum number of videos to return
+        offset: Number of videos to skip
         
     Returns:
         List of video records or None on error
     """
-    try:
-        print(f"[DB->] SELECT youtube_videos (limit={limit}, order=updated_at DESC)")
-        response = supabase.table("youtube_videos").select("*").limit(limit).order('updated_at', desc=True).execute()
+    def load_range(start: int, count: int) -> List[Dict[str, Any]]:
+        log.debug("[DB->] SELECT youtube_videos (limit=%s, offset=%s, order=updated_at DESC)", count, start)
+        response = _sb().table("youtube_videos").select("*").range(start, start + count - 1).order('updated_at', desc=True).execute()
         
         if response.data:
-            print(f"[DB<-] Retrieved {len(response.data)} videos")
+            log.debug("[DB<-] Retrieved %s videos", len(response.data))
             return response.data
         else:
-            print(f"[DB<-] No videos found")
+            log.debug("[DB<-] No videos found")
             return []
+    
+    try:
+        # A miss fetches the following page too, so the next scroll is a cache hit
+        return _video_pages.get_page(("get_all_videos",), offset, limit, load_range)
             
     except Exception as e:
-        print(f"[DB!!] {str(e)}")
+        log.error("[DB!!] %s", e)
         return None
 
 
@@ -207,7 +351,7 @@ def get_videos_by_channel(channel_id: str, limit: int = 50) -> Optional[List[Dic
         List of video records or None on error
     """
     try:
-        response = supabase.table("youtube_videos").select("*").eq("channel_id", channel_id).limit(limit).order('published_at', desc=True).execute()
+        response = _sb().table("youtube_videos").select("*").eq("channel_id", channel_id).limit(limit).order('published_at', desc=True).execute()
         
         if response.data:
             print(f"✅ Retrieved {len(response.data)} videos from channel {channel_id}")
@@ -217,13 +361,14 @@ def get_videos_by_channel(channel_id: str, limit: int = 50) -> Optional[List[Dic
             return []
             
     except Exception as e:
-        print(f"❌ Read Error: {e}")
+        log.error("[DB!!] %s", e)
         return None
 
 
 def search_videos_by_tags(tags: List[str]) -> Optional[List[Dict[str, Any]]]:
     """
-    Search videos that contain any of the specified tags
+    Search videos that contain all of the specified tags
+    (see search_videos_by_tags_any for any-of matching)
     
     Args:
         tags: List of tags to search for
@@ -232,8 +377,8 @@ def search_videos_by_tags(tags: List[str]) -> Optional[List[Dict[str, Any]]]:
         List of video records or None on error
     """
     try:
-        # PostgreSQL array overlap operator - use cs (contains) instead of ov
-        response = supabase.table("youtube_videos").select("*").filter("tags", "cs", f"{{{','.join(tags)}}}").order('view_count', desc=True).execute()
+        # tags @> {...}: contains() quotes elements with commas, quotes or braces
+        response = _sb().table("youtube_videos").select("*").contains("tags", tags).order('view_count', desc=True).execute()
         
         if response.data:
             print(f"✅ Found {len(response.data)} videos with tags: {', '.join(tags)}")
@@ -247,10 +392,100 @@ def search_videos_by_tags(tags: List[str]) -> Optional[List[Dict[str, Any]]]:
         return None
 
 
+def search_videos_by_tags_any(tags: List[str], limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+    """
+    Search videos that have at least one of the specified tags, most viewed first
+    
+    Uses the search_videos_by_tags_any RPC (GIN index lookup - see
+    .db apply/search_videos_by_tags_rpc.sql); falls back to an
+    overlap filter when the function isn't installed.
+    
+    Args:
+        tags: List of tags to search for
+        limit: Maximum number of videos to return
+        
+    Returns:
+        List of video records or None on error
+    """
+    if not tags:
+        return []
+    
+    try:
+        log.debug("[DB->] RPC search_videos_by_tags_any(tags=%s, limit=%s)", len(tags), limit)
+        try:
+            response = _sb().rpc(
+                "search_videos_by_tags_any",
+                {"p_tags": tags, "p_limit": limit}
+            ).execute()
+        except APIError as e:
+            # PGRST202: function not found - migration not applied yet
+            if e.code != "PGRST202":
+                raise
+            response = _sb().table("youtube_videos").select("*")\
+                .overlaps("tags", tags)\
+                .order('view_count', desc=True)\
+                .limit(limit)\
+                .execute()
+        
+        log.debug("[DB<-] Found %s videos with any of %s tags", len(response.data or []), len(tags))
+        return response.data or []
+        
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return None
+
+
+def drain_storage_cleanup_queue(batch_size: int = 50, fallback_video_id: Optional[str] = None) -> int:
+    """
+    Remove the chunk files of deleted videos queued in storage_cleanup_queue
+    (filled by an AFTER DELETE trigger on youtube_videos - see
+    .db apply/storage_cleanup_queue.sql), one storage remove() per batch
+    
+    Args:
+        batch_size: Videos handled per batch
+        fallback_video_id: Video to clean up directly if the queue table doesn't exist yet
+        
+    Returns:
+        Number of videos cleaned up
+    """
+    # Import here to avoid circular dependency
+    from .subtitle_chunks_storage import delete_videos_chunks_from_storage
+    
+    cleaned = 0
+    try:
+        while True:
+            response = _sb().table("storage_cleanup_queue").select("video_id")\
+                .order("created_at")\
+                .limit(batch_size)\
+                .execute()
+            video_ids = [row['video_id'] for row in response.data or []]
+            if not video_ids:
+                return cleaned
+            
+            # Failed batches stay queued for the next drain
+            if not delete_videos_chunks_from_storage(video_ids):
+                return cleaned
+            
+            execute_with_retry(_sb().table("storage_cleanup_queue").delete().in_("video_id", video_ids))
+            cleaned += len(video_ids)
+            
+    except APIError as e:
+        # PGRST205 / 42P01: queue table not created yet - migration not applied
+        if e.code in ("PGRST205", "42P01") and fallback_video_id:
+            delete_videos_chunks_from_storage([fallback_video_id])
+            return cleaned + 1
+        log.error("[DB!!] %s", e)
+        return cleaned
+    except Exception as e:
+        log.error("[DB!!] %s", e)
+        return cleaned
+
+
 def delete_video(video_id: str) -> bool:
     """
     Delete a video by its ID
-    Deletes storage files first, then DB record (which cascades to chunks)
+    One DELETE of the DB record (which cascades to chunks); the chunk files
+    are queued by a trigger and removed from storage in the background
     Note: video_notes are NOT deleted (preserved as orphaned records)
     
     Args:
@@ -260,16 +495,23 @@ def delete_video(video_id: str) -> bool:
         True if deleted successfully, False otherwise
     """
     try:
-        # Import here to avoid circular dependency
-        from .subtitle_chunks_storage import delete_video_chunks_from_storage
+        # Delete video from DB (cascades to subtitle_chunks, but NOT video_notes)
+        print(f"[DELETE] Deleting video record {video_id}")
+        response = execute_with_retry(_sb().table("youtube_videos").delete().eq("id", video_id))
+        _video_pages.invalidate()
+        _video_records.invalidate(lambda key: key == video_id)
         
-        # Step 1: Delete all chunk files from storage
-        print(f"[DELETE] Step 1: Deleting storage for video {video_id}")
-        delete_video_chunks_from_storage(video_id)
+        # Cascaded chunk rows are gone - drop any cached chunk reads
+        from .subtitle_chunks_crud import invalidate_video, refresh_chunk_index
+        invalidate_video(video_id)
+        refresh_chunk_index(video_id)
         
-        # Step 2: Delete video from DB (cascades to subtitle_chunks, but NOT video_notes)
-        print(f"[DELETE] Step 2: Deleting video record {video_id}")
-        response = supabase.table("youtube_videos").delete().eq("id", video_id).execute()
+        # Storage files are removed off the request path
+        threading.Thread(
+            target=drain_storage_cleanup_queue,
+            kwargs={"fallback_video_id": video_id},
+            daemon=True
+        ).start()
         
         print(f"✅ Deleted video: {video_id} (video_notes preserved if they exist)")
         return True
@@ -282,6 +524,8 @@ def delete_video(video_id: str) -> bool:
 def get_recently_updated_videos(hours: int = 24, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
     """
     Get videos that were updated within the specified time period
+    Windows of up to 24 h are served from the recent_videos_24h materialized
+    view (refreshed every 5 minutes), anything larger from youtube_videos
     
     Args:
         hours: Number of hours to look back
@@ -290,23 +534,40 @@ def get_recently_updated_videos(hours: int = 24, limit: int = 50) -> Optional[Li
     Returns:
         List of video records or None on error
     """
-    try:
+    def load() -> List[Dict[str, Any]]:
         # Calculate the timestamp for the cutoff
         from datetime import datetime, timedelta
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         cutoff_str = cutoff_time.isoformat()
         
-        response = supabase.table("youtube_videos").select("*").gte("updated_at", cutoff_str).limit(limit).order('updated_at', desc=True).execute()
+        def query(table: str):
+            return _sb().table(table).select("*").gte("updated_at", cutoff_str).limit(limit).order('updated_at', desc=True).execute()
+        
+        if hours <= RECENT_VIDEOS_VIEW_HOURS and limit <= RECENT_VIDEOS_VIEW_ROWS:
+            try:
+                log.debug("[DB->] SELECT %s (hours=%s, limit=%s)", RECENT_VIDEOS_VIEW, hours, limit)
+                response = query(RECENT_VIDEOS_VIEW)
+            except APIError as e:
+                # PGRST205 / 42P01: view not created yet - migration not applied
+                if e.code not in ("PGRST205", "42P01"):
+                    raise
+                response = query("youtube_videos")
+        else:
+            log.debug("[DB->] SELECT youtube_videos (hours=%s, limit=%s)", hours, limit)
+            response = query("youtube_videos")
         
         if response.data:
-            print(f"✅ Found {len(response.data)} videos updated in last {hours} hours")
+            log.debug("[DB<-] Found %s videos updated in last %s hours", len(response.data), hours)
             return response.data
         else:
-            print(f"⚠️  No recently updated videos found")
+            log.debug("[DB<-] No recently updated videos found")
             return []
+    
+    try:
+        return _video_pages.get(("get_recently_updated_videos", hours, limit), load)
             
     except Exception as e:
-        print(f"❌ Read Error: {e}")
+        log.error("[DB!!] %s", e)
         return None
 
 
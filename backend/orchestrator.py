@@ -4,7 +4,7 @@ Handles all inter-module communication and threading
 """
 
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
@@ -19,33 +19,23 @@ from prompts import get_all_prompts
 
 # Import module functions (no cross-module imports)
 from youtube import extract_video_id, fetch_video_metadata, fetch_batch_metadata
+from youtube.metadata import YOUTUBE_BATCH_SIZE, YOUTUBE_FETCH_WORKERS
 from subtitles import extract_and_chunk_subtitles
 from openai_api.enrichment import enrich_chunk, enrich_chunks_parallel
 
 # Import from db
 from db.youtube_crud import create_or_update_video, get_video_by_id, bulk_create_or_update_videos
-from db.subtitle_chunks_crud import create_chunk, get_chunks_by_video, delete_chunks_by_video, update_chunk_ai_fields, bulk_create_chunks, bulk_update_ai_fields
+from db.subtitle_chunks_crud import create_chunk, get_chunks_metadata, delete_chunks_by_video, update_chunk_ai_fields, bulk_create_chunks, bulk_update_ai_fields, bulk_set_ai_fields
 from db.video_notes_crud import create_or_update_note, get_note_by_video_id
 from db.book_chapters_crud import get_chapters_by_book, load_chapters_text, update_chapter_ai_fields
 from db.books_crud import get_book_by_id
 
 
-def process_video_metadata(video_url: str) -> Optional[Dict[str, Any]]:
-    """
-    Fetch and save video metadata
-    Returns: video metadata dict
-    """
-    video_id = extract_video_id(video_url)
-    if not video_id:
-        return None
-    
-    metadata = fetch_video_metadata(video_id)
-    if not metadata:
-        return None
-    
-    # Convert to YouTube API format for create_or_update_video
-    video_data = {
+def _to_video_data(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert fetched metadata back to YouTube API format for the youtube_crud writers"""
+    return {
         'id': metadata['video_id'],
+        'etag': metadata.get('etag'),
         'snippet': {
             'title': metadata['title'],
             'channelTitle': metadata['channel_title'],
@@ -61,30 +51,79 @@ def process_video_metadata(video_url: str) -> Optional[Dict[str, Any]]:
             'likeCount': str(metadata.get('like_count', 0)),
         }
     }
+
+
+def process_video_metadata(video_url: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch and save video metadata
+    Returns: video metadata dict (the saved youtube_videos row under 'video')
+    """
+    video_id = extract_video_id(video_url)
+    if not video_id:
+        return None
+    
+    metadata = fetch_video_metadata(video_id)
+    if not metadata:
+        return None
     
-    # Save to database
-    create_or_update_video(video_data)
+    # Save to database (the upsert returns the stored row - no re-read needed)
+    metadata['video'] = create_or_update_video(_to_video_data(metadata))
     
     return metadata
 
 
 def process_batch_metadata(video_urls: List[str]) -> List[Dict[str, Any]]:
     """
-    Fetch and save metadata for multiple videos (up to 50)
+    Fetch and save metadata for multiple videos (fetched in concurrent batches of 50)
     Returns: list of video metadata dicts
     """
-    video_ids = [extract_video_id(url) for url in video_urls]
-    video_ids = [vid for vid in video_ids if vid]
+    return [
+        metadata
+        for result in iter_batch_metadata(video_urls)
+        for metadata in result['metadata']
+    ]
+
+
+def iter_batch_metadata(video_urls: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming version of process_batch_metadata: yields each batch as soon as
+    it is fetched and saved, so callers can start on early videos while later
+    batches are still being fetched (and only one batch is held at a time)
+    Yields: {'batch', 'total_batches', 'metadata' (list of dicts), 'stored' (saved rows or None)}
+    """
+    # Deduplicated: the same video twice in one upsert batch makes Postgres reject it
+    video_ids = list(dict.fromkeys(vid for vid in map(extract_video_id, video_urls) if vid))
     
     if not video_ids:
-        return []
+        return
     
-    metadata_list = fetch_batch_metadata(video_ids)
+    batches = [
+        video_ids[start:start + YOUTUBE_BATCH_SIZE]
+        for start in range(0, len(video_ids), YOUTUBE_BATCH_SIZE)
+    ]
     
-    if metadata_list:
-        bulk_create_or_update_videos(metadata_list)
-    
-    return metadata_list
+    # Pipelined: each batch is written as soon as its fetch returns, while
+    # the remaining YouTube requests are still in flight
+    with ThreadPoolExecutor(max_workers=min(YOUTUBE_FETCH_WORKERS, len(batches))) as fetch_pool:
+        fetches = [fetch_pool.submit(fetch_batch_metadata, batch) for batch in batches]
+        try:
+            for batch_num, future in enumerate(fetches, 1):
+                batch_metadata = future.result()
+                stored = None
+                if batch_metadata:
+                    stored = bulk_create_or_update_videos(
+                        [_to_video_data(metadata) for metadata in batch_metadata]
+                    )
+                yield {
+                    'batch': batch_num,
+                    'total_batches': len(batches),
+                    'metadata': batch_metadata,
+                    'stored': stored
+                }
+        finally:
+            # A consumer that stops early doesn't wait for unstarted fetches
+            for future in fetches:
+                future.cancel()
 
 
 def process_video_subtitles(video_id: str) -> Optional[List[Dict[str, Any]]]:
@@ -163,7 +202,11 @@ def process_video_subtitles_only(video_id: str) -> Dict[str, Any]:
     try:
         # Step 1: Delete existing chunks
         print("[1/3] Deleting existing chunks...", flush=True)
-        delete_chunks_by_video(video_id)
+        # The save below runs in ingest mode (existing rows are skipped), so
+        # leftover rows would silently keep their old text and AI fields
+        if not delete_chunks_by_video(video_id):
+            print("Failed to delete existing chunks", flush=True)
+            return {"success": False, "chunk_count": 0, "error": "Failed to delete existing chunks"}
         print("Existing chunks deleted\n", flush=True)
         
         # Step 2: Extract subtitles
@@ -180,21 +223,18 @@ def process_video_subtitles_only(video_id: str) -> Dict[str, Any]:
         print("[3/3] Saving all chunks to database (bulk operation)...", flush=True)
         
         # Prepare chunks for bulk insert (1-indexed)
+        # AI fields are omitted - they default to NULL in the schema
         chunks_for_db = [
             {
                 'video_id': video_id,
                 'chunk_id': i + 1,  # 1-indexed: starts from 1
-                'chunk_text': chunk['text'],
-                'short_title': None,
-                'ai_field_1': None,
-                'ai_field_2': None,
-                'ai_field_3': None
+                'chunk_text': chunk['text']
             }
             for i, chunk in enumerate(chunks)
         ]
         
-        # Single database transaction for all chunks
-        result = bulk_create_chunks(chunks_for_db)
+        # Single database transaction for all chunks (ingest mode - existing rows are skipped)
+        result = bulk_create_chunks(chunks_for_db, ingest=True)
         
         if not result:
             print("Failed to save chunks to database", flush=True)
@@ -230,7 +270,7 @@ def process_ai_enrichment_only(video_id: str) -> bool:
     try:
         # Step 1: Get chunks from database
         print("[1/3] Loading chunks from database...", flush=True)
-        chunks = get_chunks_by_video(video_id)
+        chunks = get_chunks_metadata(video_id)
         
         if not chunks:
             print("No chunks found. Please process subtitles first.", flush=True)
@@ -284,7 +324,7 @@ def process_ai_enrichment_only(video_id: str) -> bool:
             print("Failed to update chunks in database", flush=True)
             return False
         
-        print(f"Updated {len(enriched_chunks)} chunks with targeted updates", flush=True)
+        print(f"Updated {len(result)}/{len(enriched_chunks)} chunks with targeted updates", flush=True)
         print(f"\n{'='*70}", flush=True)
         print("AI enrichment complete!", flush=True)
         print(f"{'='*70}\n", flush=True)
@@ -587,8 +627,8 @@ def process_video_all_chunks_ai_enrichment(video_id: str) -> bool:
     try:
         # Step 1: Get all chunks from database
         print("[1/4] Loading chunks from database...", flush=True)
-        from db.subtitle_chunks_crud import get_chunks_by_video, load_chunks_text
-        chunks = get_chunks_by_video(video_id)
+        from db.subtitle_chunks_crud import get_chunks_metadata, load_chunks_text
+        chunks = get_chunks_metadata(video_id)
         
         if not chunks:
             print("No chunks found for this video.", flush=True)
@@ -638,18 +678,18 @@ def process_video_all_chunks_ai_enrichment(video_id: str) -> bool:
         # Step 4: Update all chunks in database
         print("\n[4/4] Saving AI fields to database...", flush=True)
         
-        success_count = 0
+        # One batched UPDATE for all chunks instead of an UPDATE per chunk
+        updates = []
         for enriched in enriched_chunks:
-            updated = update_chunk_ai_fields(
-                video_id=enriched['video_id'],
-                chunk_id=enriched['chunk_id'],
-                short_title=enriched.get('title'),
-                ai_field_1=enriched.get('field_1'),
-                ai_field_2=enriched.get('field_2'),
-                ai_field_3=enriched.get('field_3')
-            )
-            if updated:
-                success_count += 1
+            update = {'video_id': enriched['video_id'], 'chunk_id': enriched['chunk_id']}
+            for field, column in (('title', 'short_title'), ('field_1', 'ai_field_1'),
+                                  ('field_2', 'ai_field_2'), ('field_3', 'ai_field_3')):
+                if enriched.get(field) is not None:
+                    update[column] = enriched[field]
+            updates.append(update)
+        
+        updated = bulk_set_ai_fields(updates)
+        success_count = len(updated) if updated else 0
         
         print(f"Successfully updated {success_count}/{len(enriched_chunks)} chunks", flush=True)
         print(f"\n{'='*70}", flush=True)
@@ -692,7 +732,7 @@ def process_video_chunk_ai_enrichment(video_id: str, chunk_id: int, chunk_text:
         else:
             print("[1/3] Loading chunk from database...", flush=True)
             from db.subtitle_chunks_crud import get_chunk_details
-            chunk = get_chunk_details(video_id, chunk_id)
+            chunk = get_chunk_details(video_id, chunk_id, prefetch=False)
             
             if not chunk:
                 print(f"Chunk not found: {video_id} / {chunk_id}", flush=True)
@@ -779,7 +819,7 @@ def regenerate_video_chunk_ai_field(
         else:
             print("[1/4] Loading chunk from database...")
             from db.subtitle_chunks_crud import get_chunk_details
-            chunk = get_chunk_details(video_id, chunk_id)
+            chunk = get_chunk_details(video_id, chunk_id, prefetch=False)
             
             if not chunk:
                 return {'error': 'Chunk not found'}
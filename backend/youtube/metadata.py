@@ -5,28 +5,62 @@ Output: Dict with video metadata
 """
 
 import os
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 import re
 
-load_dotenv()
+# videos.list accepts at most 50 ids per request; larger inputs are split into
+# batches fetched concurrently (a few at a time to stay within API quota bursts)
+YOUTUBE_BATCH_SIZE = 50
+YOUTUBE_FETCH_WORKERS = 8
+
+# One API client per thread and key: its httplib2.Http keeps the connection to
+# www.googleapis.com alive, so later calls skip the TCP/TLS handshake (and the
+# discovery-document load build() does). httplib2 isn't thread-safe, hence per thread
+_clients = threading.local()
+
+
+@functools.lru_cache(maxsize=1)
+def _env_api_key() -> Optional[str]:
+    """YOUTUBE_API_KEY, reading .env on first use instead of at import"""
+    load_dotenv()
+    return os.getenv("YOUTUBE_API_KEY")
+
+
+def _youtube_client(api_key: str):
+    """Get (or lazily build) this thread's YouTube Data API client for api_key"""
+    clients = getattr(_clients, "by_key", None)
+    if clients is None:
+        clients = _clients.by_key = {}
+    
+    if api_key not in clients:
+        # static_discovery: use the discovery document bundled with the client
+        # library instead of downloading it from googleapis.com
+        clients[api_key] = build(
+            'youtube', 'v3',
+            developerKey=api_key,
+            static_discovery=True,
+            cache_discovery=False
+        )
+    return clients[api_key]
+
+
+# Compiled once. A bare 11-character ID is checked first (it can't contain
+# '/' or 'v='); otherwise the ID follows 'v=' or a '/' (watch, youtu.be,
+# embed/, shorts/, ...) - so the URL is scanned once
+_PLAIN_ID_RE = re.compile(r'^([0-9A-Za-z_-]{11})$')
+_URL_ID_RE = re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11})')
 
 
 def extract_video_id(url: str) -> Optional[str]:
     """Extract video ID from YouTube URL"""
-    patterns = [
-        r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-        r'(?:embed\/)([0-9A-Za-z_-]{11})',
-        r'^([0-9A-Za-z_-]{11})$'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    match = _PLAIN_ID_RE.match(url) or _URL_ID_RE.search(url)
+    return match.group(1) if match else None
 
 
 def fetch_video_metadata(video_id: str, api_key: str = None) -> Optional[Dict[str, Any]]:
@@ -35,13 +69,13 @@ def fetch_video_metadata(video_id: str, api_key: str = None) -> Optional[Dict[st
     Returns: Dict with video metadata or None if error
     """
     if not api_key:
-        api_key = os.getenv("YOUTUBE_API_KEY")
+        api_key = _env_api_key()
     
     if not api_key:
         raise ValueError("YouTube API key not found")
     
     try:
-        youtube = build('youtube', 'v3', developerKey=api_key)
+        youtube = _youtube_client(api_key)
         
         request = youtube.videos().list(
             part='snippet,contentDetails,statistics',
@@ -60,6 +94,7 @@ def fetch_video_metadata(video_id: str, api_key: str = None) -> Optional[Dict[st
         
         return {
             'video_id': video_id,
+            'etag': item.get('etag'),
             'title': snippet.get('title'),
             'channel_title': snippet.get('channelTitle'),
             'channel_id': snippet.get('channelId'),
@@ -81,20 +116,41 @@ def fetch_video_metadata(video_id: str, api_key: str = None) -> Optional[Dict[st
 
 def fetch_batch_metadata(video_ids: List[str], api_key: str = None) -> List[Dict[str, Any]]:
     """
-    Fetch metadata for multiple videos (up to 50)
+    Fetch metadata for multiple videos
+    More than YOUTUBE_BATCH_SIZE ids are split into batches requested concurrently,
+    so the total time is close to that of the slowest batch
     Returns: List of video metadata dicts
     """
     if not api_key:
-        api_key = os.getenv("YOUTUBE_API_KEY")
+        api_key = _env_api_key()
     
     if not api_key:
         raise ValueError("YouTube API key not found")
     
-    if len(video_ids) > 50:
-        raise ValueError("Maximum 50 video IDs per batch request")
+    # Each id costs quota - never request the same video twice
+    unique_ids = list(dict.fromkeys(video_ids))
+    if len(unique_ids) < len(video_ids):
+        print(f"Skipping {len(video_ids) - len(unique_ids)} duplicate video IDs")
+    video_ids = unique_ids
+    
+    batches = [
+        video_ids[start:start + YOUTUBE_BATCH_SIZE]
+        for start in range(0, len(video_ids), YOUTUBE_BATCH_SIZE)
+    ]
+    
+    if len(batches) <= 1:
+        return [video for batch in batches for video in _fetch_batch(batch, api_key)]
     
+    # Each worker thread uses its own client - httplib2 connections aren't thread-safe
+    with ThreadPoolExecutor(max_workers=min(YOUTUBE_FETCH_WORKERS, len(batches))) as pool:
+        results = list(pool.map(lambda batch: _fetch_batch(batch, api_key), batches))
+    return [video for result in results for video in result]
+
+
+def _fetch_batch(video_ids: List[str], api_key: str) -> List[Dict[str, Any]]:
+    """Fetch metadata for up to YOUTUBE_BATCH_SIZE videos in one videos.list request"""
     try:
-        youtube = build('youtube', 'v3', developerKey=api_key)
+        youtube = _youtube_client(api_key)
         
         request = youtube.videos().list(
             part='snippet,contentDetails,statistics',
@@ -112,6 +168,7 @@ def fetch_batch_metadata(video_ids: List[str], api_key: str = None) -> List[Dict
             
             results.append({
                 'video_id': video_id,
+                'etag': item.get('etag'),
                 'title': snippet.get('title'),
                 'channel_title': snippet.get('channelTitle'),
                 'channel_id': snippet.get('channelId'),